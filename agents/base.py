@@ -14,6 +14,8 @@ class BaseAgent:
         self.inbox: asyncio.Queue[Message] = asyncio.Queue()
         self._handlers: Dict[str, Callable[[Message], Any]] = {}
         self._running = False
+        # Set once run() has started consuming the inbox
+        self.started = asyncio.Event()
 
         router.register_agent(name, self.inbox)
 
@@ -82,6 +84,7 @@ class BaseAgent:
 
     async def run(self) -> None:
         self._running = True
+        self.started.set()
         logger.info(f"Agent {self.name} started")
 
         while self._running:
@@ -93,6 +96,7 @@ class BaseAgent:
             except Exception as e:
                 logger.error(f"Error in agent {self.name}: {e}")
 
+        self.started.clear()
         logger.info(f"Agent {self.name} stopped")
 
     def stop(self) -> None:
@@ -1,4 +1,5 @@
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
@@ -17,45 +18,67 @@ class DatabaseManagerAgent(BaseAgent):
             str(config.get_cea_root()),
             config.get_script_discovery_timeout()
         )
+        # Running refreshes by CEA root override, shared by concurrent callers
+        self._refresh_inflight: Dict[Optional[str], asyncio.Task] = {}
         self.setup_handlers()
 
+    async def refresh_catalog(self, cea_root_override: Optional[str] = None) -> Dict[str, Any]:
+        """Discover scripts and upsert them into the database.
+
+        Called directly by in-process callers that already hold this agent;
+        remote agents go through the ``refresh_catalog`` message handler.
+        Calls for the same root while a refresh is running wait for that
+        refresh and get its result instead of rescanning.
+        """
+        task = self._refresh_inflight.get(cea_root_override)
+        if task is None:
+            task = asyncio.create_task(self._refresh_catalog(cea_root_override))
+            self._refresh_inflight[cea_root_override] = task
+            task.add_done_callback(lambda _: self._refresh_inflight.pop(cea_root_override, None))
+        # A cancelled caller must not cancel the refresh others are waiting on
+        return await asyncio.shield(task)
+
+    async def _refresh_catalog(self, cea_root_override: Optional[str]) -> Dict[str, Any]:
+        """Run one discovery and upsert pass."""
+        if cea_root_override:
+            discovery = ScriptDiscovery(cea_root_override, config.get_script_discovery_timeout())
+        else:
+            discovery = self.script_discovery
+
+        # Discover scripts
+        logger.info(f"Starting script discovery in: {discovery.cea_root}")
+        scripts = await discovery.discover_scripts()
+
+        # Upsert discovered scripts into database
+        upserted_count = 0
+        for script in scripts:
+            try:
+                await self.dao.upsert_script(script)
+                upserted_count += 1
+            except Exception as e:
+                logger.error(f"Failed to upsert script {script.name}: {e}")
+
+        logger.info(f"Catalog refresh completed: {len(scripts)} discovered, {upserted_count} upserted")
+
+        return {
+            "scripts_discovered": len(scripts),
+            "scripts_upserted": upserted_count,
+            "cea_root": str(discovery.cea_root)
+        }
+
     def setup_handlers(self) -> None:
         @self.on("refresh_catalog")
         async def handle_refresh_catalog(message: Message) -> None:
             logger.info(f"DatabaseManagerAgent received refresh catalog request: {message.content}")
 
             try:
-                # Get optional path override from message
-                cea_root_override = message.content.get("cea_root")
-                if cea_root_override:
-                    discovery = ScriptDiscovery(cea_root_override, config.get_script_discovery_timeout())
-                else:
-                    discovery = self.script_discovery
-
-                # Discover scripts
-                logger.info(f"Starting script discovery in: {discovery.cea_root}")
-                scripts = await discovery.discover_scripts()
-
-                # Upsert discovered scripts into database
-                upserted_count = 0
-                for script in scripts:
-                    try:
-                        await self.dao.upsert_script(script)
-                        upserted_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to upsert script {script.name}: {e}")
-
-                logger.info(f"Catalog refresh completed: {len(scripts)} discovered, {upserted_count} upserted")
+                result = await self.refresh_catalog(message.content.get("cea_root"))
 
                 await self.reply(
                     message,
                     Performative.INFORM,
                     "catalog_refreshed",
-                    {
-                        "scripts_discovered": len(scripts),
-                        "scripts_upserted": upserted_count,
-                        "cea_root": str(discovery.cea_root)
-                    }
+                    result
                 )
 
             except Exception as e:
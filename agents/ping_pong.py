@@ -14,6 +14,7 @@ class PingerAgent(BaseAgent):
         self.response_received = False
         self.response_message: Optional[Message] = None
         self.ping_sent_time: Optional[float] = None
+        self._response_event = asyncio.Event()
         self.setup_handlers()
 
     def setup_handlers(self) -> None:
@@ -22,6 +23,7 @@ class PingerAgent(BaseAgent):
             logger.info(f"PingerAgent received pong: {message.content}")
             self.response_received = True
             self.response_message = message
+            self._response_event.set()
 
     async def send_ping(self, conversation_id: Optional[str] = None) -> bool:
         self.ping_sent_time = time.time()
@@ -33,10 +35,19 @@ class PingerAgent(BaseAgent):
             conversation_id=conversation_id,
         )
 
+    async def wait_for_response(self, timeout: float) -> bool:
+        """Wait until a pong arrives; False if none did within timeout seconds"""
+        try:
+            await asyncio.wait_for(self._response_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
     def reset(self) -> None:
         self.response_received = False
         self.response_message = None
         self.ping_sent_time = None
+        self._response_event.clear()
 
 
 class PongerAgent(BaseAgent):
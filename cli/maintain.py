@@ -14,6 +14,8 @@ All destructive operations support --dry-run (default) and --apply modes.
 
 import asyncio
 import json
+import os
+import re
 import shutil
 import sqlite3
 import sys
@@ -22,6 +24,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import typer
 from loguru import logger
 from rich.console import Console
@@ -37,7 +40,34 @@ app = typer.Typer(
     help="CEA Assistant database maintenance operations",
     rich_markup_mode="rich"
 )
-console = Console()
+# Skip Rich's repr highlighter when output is piped (CI, batch runs); markup is
+# still parsed so style tags never leak into plain output
+console = Console(highlight=sys.stdout.isatty())
+
+BYTES_PER_MB = 1024 * 1024
+
+# Reindex timing probes, kept as constants so every run reuses the same SQL
+# text (and therefore the same cached prepared statement)
+TAG_SEARCH_SQL = "SELECT COUNT(*) FROM scripts WHERE json_extract(tags, '$') LIKE '%cooling%'"
+NAME_SEARCH_SQL = "SELECT COUNT(*) FROM scripts WHERE name LIKE '%demand%'"
+FTS_SEARCH_SQL = "SELECT COUNT(*) FROM scripts_fts WHERE scripts_fts MATCH 'cooling'"
+
+# Canonicalization helpers
+_WORD_RE = re.compile(r'[a-zA-Z0-9]+')
+_SNAKE_CASE_RE = re.compile(r'[a-z0-9]+(?:_[a-z0-9]+)*')
+_JSON_PASSTHROUGH = (str, int, float, bool, type(None), list, dict)
+
+# Common synonym mappings for input/output keys
+_IO_SYNONYMS = {
+    'epw': 'weather_epw',
+    'weather_file': 'weather_epw',
+    'weather': 'weather_epw',
+    'zone': 'zone_geojson',
+    'geometry': 'zone_geojson',
+    'district_geojson': 'zone_geojson',
+    'cost': 'cost_params',
+    'capex_opex': 'cost_params',
+}
 
 # Global options that apply to all commands
 DatabaseOption = typer.Option(
@@ -55,6 +85,17 @@ ConversationIdOption = typer.Option(
     "--conversation-id",
     help="Conversation ID for structured logging"
 )
+FullAnalyzeOption = typer.Option(
+    False,
+    "--full",
+    help="Run a full ANALYZE instead of PRAGMA optimize (use on first run)"
+)
+QuietOption = typer.Option(
+    False,
+    "--quiet",
+    "-q",
+    help="Suppress progress output (errors are still reported)"
+)
 
 
 class MaintenanceContext:
@@ -102,6 +143,56 @@ def get_db_path(db_path: Optional[str] = None) -> str:
     return str(settings.get_db_path())
 
 
+def update_statistics(conn: sqlite3.Connection, full: bool = False) -> None:
+    """Refresh query planner statistics.
+
+    PRAGMA optimize only re-analyzes tables whose statistics are stale, and
+    analysis_limit bounds the rows sampled per index, so repeated maintenance
+    runs are close to free. A full ANALYZE rescans every table.
+    """
+    if full:
+        conn.execute("ANALYZE")
+    else:
+        conn.execute("PRAGMA analysis_limit = 1000")
+        conn.execute("PRAGMA optimize")
+
+
+def get_database_size(conn: sqlite3.Connection) -> int:
+    """Get the database size in bytes from its page count (no stat() call)"""
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def format_mb(size_bytes: int) -> str:
+    """Format a byte count as megabytes for display"""
+    return f"{size_bytes / BYTES_PER_MB:.2f} MB"
+
+
+def claim_exclusive_access(conn: sqlite3.Connection) -> bool:
+    """Make ``conn`` the only connection to its database, if nobody else has it open.
+
+    SQLite refuses to leave WAL mode while any other connection has the
+    database open, which makes the switch a reliable probe for idle readers
+    as well as active transactions. On success the WAL is checkpointed away
+    and an exclusive lock is held until ``conn`` is closed.
+    """
+    conn.execute("PRAGMA busy_timeout = 0")
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        mode = conn.execute("PRAGMA journal_mode = DELETE").fetchone()[0]
+    except sqlite3.OperationalError:
+        return False
+    if mode.lower() != "delete":
+        return False
+
+    # Exclusive locking mode keeps the lock taken by the next write
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+    conn.execute("BEGIN EXCLUSIVE")
+    conn.commit()
+    return True
+
+
 def create_backup_dir() -> Path:
     """Create backups directory if it doesn't exist"""
     backup_dir = Path("backups")
@@ -149,17 +240,13 @@ def backup(
         raise typer.Exit(1)
 
 
-@app.command()
-def migrate(
-    db_path: Optional[str] = DatabaseOption,
-    dry_run: bool = DryRunOption,
-    conversation_id: Optional[str] = ConversationIdOption,
+def run_migrations(
+    db_path: Optional[str],
+    dry_run: bool,
+    conversation_id: Optional[str],
+    out: Console,
 ) -> None:
-    """
-    Apply schema migrations to bring database to latest version.
-
-    Creates backup before applying changes when --apply is used.
-    """
+    """Apply (or preview) pending migrations, reporting progress on ``out``"""
     db_file = get_db_path(db_path)
 
     async def run_migration():
@@ -170,11 +257,11 @@ def migrate(
         current_version = await migration_manager.get_schema_version()
         target_version = migration_manager.get_target_version()
 
-        console.print(f"Current schema version: {current_version}")
-        console.print(f"Target schema version: {target_version}")
+        out.print(f"Current schema version: {current_version}")
+        out.print(f"Target schema version: {target_version}")
 
         if not needs_migration:
-            console.print("[green]✓[/green] Database is already up to date")
+            out.print("[green]✓[/green] Database is already up to date")
             return
 
         # Run migrations
@@ -182,16 +269,16 @@ def migrate(
             if not dry_run:
                 # Create backup before migration
                 backup_path = backup(db_path, conversation_id)
-                console.print(f"Backup created: {backup_path}")
+                out.print(f"Backup created: {backup_path}")
 
-            console.print(f"\n[yellow]{'Migration Plan (DRY RUN):' if dry_run else 'Applying migrations:'}[/yellow]")
+            out.print(f"\n[yellow]{'Migration Plan (DRY RUN):' if dry_run else 'Applying migrations:'}[/yellow]")
 
             operations = await migration_manager.migrate(dry_run=dry_run)
             for operation in operations:
-                console.print(f"  {operation}")
+                out.print(f"  {operation}")
 
             if not dry_run:
-                console.print("[green]✓[/green] Migration completed successfully")
+                out.print("[green]✓[/green] Migration completed successfully")
                 logger.info("Database migration completed")
 
         except Exception as e:
@@ -205,6 +292,20 @@ def migrate(
     asyncio.run(run_migration())
 
 
+@app.command()
+def migrate(
+    db_path: Optional[str] = DatabaseOption,
+    dry_run: bool = DryRunOption,
+    conversation_id: Optional[str] = ConversationIdOption,
+) -> None:
+    """
+    Apply schema migrations to bring database to latest version.
+
+    Creates backup before applying changes when --apply is used.
+    """
+    run_migrations(db_path, dry_run, conversation_id, console)
+
+
 @app.command()
 def integrity(
     db_path: Optional[str] = DatabaseOption,
@@ -276,8 +377,7 @@ def report(
         summary_table.add_row("Schema Version", str(get_schema_version(conn)))
 
         # Database size
-        db_size = Path(db_file).stat().st_size / 1024 / 1024  # MB
-        summary_table.add_row("Database Size", f"{db_size:.2f} MB")
+        summary_table.add_row("Database Size", format_mb(get_database_size(conn)))
 
         console.print(summary_table)
 
@@ -291,10 +391,10 @@ def report(
             for row in cursor:
                 if row[0]:
                     try:
-                        tags = json.loads(row[0])
+                        tags = orjson.loads(row[0])
                         for tag in tags:
                             tag_counts[tag] = tag_counts.get(tag, 0) + 1
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         pass
 
             if tag_counts:
@@ -321,12 +421,12 @@ def report(
             for row in cursor:
                 if row[0]:
                     try:
-                        steps = json.loads(row[0])
+                        steps = orjson.loads(row[0])
                         for step in steps:
                             if 'script_id' in step:
                                 script_id = step['script_id']
                                 script_refs[script_id] = script_refs.get(script_id, 0) + 1
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         pass
 
             if script_refs:
@@ -454,7 +554,7 @@ def canonicalize(
             script_id, tags_json = row
             if tags_json:
                 try:
-                    original_tags = json.loads(tags_json)
+                    original_tags = orjson.loads(tags_json)
                     canonical_tags = canonicalize_tags(original_tags)
 
                     if original_tags != canonical_tags:
@@ -469,10 +569,10 @@ def canonicalize(
                         if not dry_run:
                             conn.execute(
                                 "UPDATE scripts SET tags = ? WHERE id = ?",
-                                (json.dumps(canonical_tags), script_id)
+                                (orjson.dumps(canonical_tags).decode(), script_id)
                             )
 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.warning(f"Invalid JSON in scripts.tags for id {script_id}")
 
         # Canonicalize workflow tags
@@ -481,7 +581,7 @@ def canonicalize(
             workflow_id, tags_json = row
             if tags_json:
                 try:
-                    original_tags = json.loads(tags_json)
+                    original_tags = orjson.loads(tags_json)
                     canonical_tags = canonicalize_tags(original_tags)
 
                     if original_tags != canonical_tags:
@@ -496,10 +596,10 @@ def canonicalize(
                         if not dry_run:
                             conn.execute(
                                 "UPDATE workflows SET tags = ? WHERE id = ?",
-                                (json.dumps(canonical_tags), workflow_id)
+                                (orjson.dumps(canonical_tags).decode(), workflow_id)
                             )
 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.warning(f"Invalid JSON in workflows.tags for id {workflow_id}")
 
         # Canonicalize script inputs/outputs
@@ -509,7 +609,7 @@ def canonicalize(
                 script_id, data_json = row
                 if data_json:
                     try:
-                        original_data = json.loads(data_json)
+                        original_data = orjson.loads(data_json)
                         canonical_data = canonicalize_io_data(original_data)
 
                         if original_data != canonical_data:
@@ -524,10 +624,10 @@ def canonicalize(
                             if not dry_run:
                                 conn.execute(
                                     f"UPDATE scripts SET {column} = ? WHERE id = ?",
-                                    (json.dumps(canonical_data), script_id)
+                                    (orjson.dumps(canonical_data).decode(), script_id)
                                 )
 
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         logger.warning(f"Invalid JSON in scripts.{column} for id {script_id}")
 
         if dry_run:
@@ -575,7 +675,7 @@ def prune_orphans(
             workflow_id, workflow_name, steps_json = row
             if steps_json:
                 try:
-                    steps = json.loads(steps_json)
+                    steps = orjson.loads(steps_json)
                     new_steps = []
                     has_orphans = False
 
@@ -625,10 +725,10 @@ def prune_orphans(
                         if not dry_run:
                             conn.execute(
                                 "UPDATE workflows SET steps = ? WHERE id = ?",
-                                (json.dumps(new_steps), workflow_id)
+                                (orjson.dumps(new_steps).decode(), workflow_id)
                             )
 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.warning(f"Invalid JSON in workflow {workflow_id} steps")
 
         if dry_run:
@@ -739,7 +839,7 @@ def dedupe(
                             workflow_id, steps_json = workflow_row
                             if steps_json:
                                 try:
-                                    steps = json.loads(steps_json)
+                                    steps = orjson.loads(steps_json)
                                     updated = False
 
                                     for step in steps:
@@ -750,10 +850,10 @@ def dedupe(
                                     if updated:
                                         conn.execute(
                                             "UPDATE workflows SET steps = ? WHERE id = ?",
-                                            (json.dumps(steps), workflow_id)
+                                            (orjson.dumps(steps).decode(), workflow_id)
                                         )
 
-                                except json.JSONDecodeError:
+                                except orjson.JSONDecodeError:
                                     pass
 
                         # Delete the duplicate script
@@ -770,26 +870,39 @@ def dedupe(
 def reindex(
     db_path: Optional[str] = DatabaseOption,
     conversation_id: Optional[str] = ConversationIdOption,
+    full: bool = FullAnalyzeOption,
+    quiet: bool = QuietOption,
 ) -> None:
     """
     Create/refresh indexes and FTS virtual tables for optimal performance.
     """
     db_file = get_db_path(db_path)
+    # A quiet console drops print() calls before any rendering happens;
+    # failures are still reported on the module console
+    out = Console(quiet=True) if quiet else console
 
     with MaintenanceContext(db_file, conversation_id) as conn:
-        console.print("[blue]Rebuilding indexes and FTS...[/blue]")
+        out.print("[blue]Rebuilding indexes and FTS...[/blue]")
 
         try:
             # Ensure we have the latest schema
-            migrate(db_path, dry_run=False, conversation_id=conversation_id)
+            run_migrations(db_path, False, conversation_id, out)
 
-            # Rebuild FTS
-            conn.execute("INSERT INTO scripts_fts(scripts_fts) VALUES('rebuild')")
+            # Rebuild FTS and refresh optimizer statistics in one write
+            # transaction so the journal is synced once
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT INTO scripts_fts(scripts_fts) VALUES('rebuild')")
+                update_statistics(conn, full)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
-            # Analyze tables for query optimizer
-            conn.execute("ANALYZE")
+            out.print("[green]✓[/green] Indexes and FTS rebuilt successfully")
 
-            console.print("[green]✓[/green] Indexes and FTS rebuilt successfully")
+            if quiet:
+                return
 
             # Show query timing examples
             console.print("\\n[blue]Query Performance Test:[/blue]")
@@ -798,18 +911,18 @@ def reindex(
 
             # Test tag search
             start = time.time()
-            conn.execute("SELECT COUNT(*) FROM scripts WHERE json_extract(tags, '$') LIKE '%cooling%'").fetchone()
+            conn.execute(TAG_SEARCH_SQL).fetchone()
             tag_time = (time.time() - start) * 1000
 
             # Test name search
             start = time.time()
-            conn.execute("SELECT COUNT(*) FROM scripts WHERE name LIKE '%demand%'").fetchone()
+            conn.execute(NAME_SEARCH_SQL).fetchone()
             name_time = (time.time() - start) * 1000
 
             # Test FTS search
             try:
                 start = time.time()
-                conn.execute("SELECT COUNT(*) FROM scripts_fts WHERE scripts_fts MATCH 'cooling'").fetchone()
+                conn.execute(FTS_SEARCH_SQL).fetchone()
                 fts_time = (time.time() - start) * 1000
             except sqlite3.OperationalError:
                 fts_time = "N/A (FTS not available)"
@@ -824,6 +937,10 @@ def reindex(
 
             console.print(timing_table)
 
+        except typer.Exit:
+            # Already reported by the step that failed
+            raise
+
         except Exception as e:
             logger.error(f"Reindex failed: {e}")
             console.print(f"[red]✗[/red] Reindex failed: {e}")
@@ -834,44 +951,90 @@ def reindex(
 def vacuum(
     db_path: Optional[str] = DatabaseOption,
     conversation_id: Optional[str] = ConversationIdOption,
+    full: bool = FullAnalyzeOption,
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="Remove a stale lock file left behind by an interrupted vacuum"
+    ),
 ) -> None:
     """
     Reclaim space and optimize database storage (VACUUM + ANALYZE).
+
+    When no other connection has the database open, the compacted copy is
+    written with VACUUM INTO to a shadow file next to the database and swapped
+    in with an atomic rename while an exclusive lock keeps new connections
+    out. If other connections are open, swapping the file underneath them
+    would lose their writes, so the database is vacuumed in place instead.
     """
     db_file = get_db_path(db_path)
     db_path_obj = Path(db_file)
+    shadow_path = db_path_obj.with_suffix(".vacuum.tmp")
+    lock_path = db_path_obj.with_suffix(".vacuum.lock")
 
-    # Get size before
-    size_before = db_path_obj.stat().st_size / 1024 / 1024  # MB
+    if force:
+        lock_path.unlink(missing_ok=True)
 
-    with MaintenanceContext(db_file, conversation_id) as conn:
-        console.print("[blue]Running VACUUM and ANALYZE...[/blue]")
+    try:
+        lock_path.touch(exist_ok=False)
+    except FileExistsError:
+        console.print(f"[red]✗[/red] Vacuum already in progress (lock file: {lock_path})")
+        console.print("If no vacuum is running, re-run with --force to remove the stale lock")
+        raise typer.Exit(1)
 
-        try:
-            # VACUUM reclaims space
-            conn.execute("VACUUM")
+    try:
+        with MaintenanceContext(db_file, conversation_id) as conn:
+            console.print("[blue]Running VACUUM and ANALYZE...[/blue]")
 
-            # ANALYZE updates query planner statistics
-            conn.execute("ANALYZE")
+            # Get size before (in bytes)
+            size_before = get_database_size(conn)
 
-            console.print("[green]✓[/green] Database optimized successfully")
+            try:
+                # Update query planner statistics (copied along by VACUUM INTO)
+                update_statistics(conn, full)
+                conn.commit()
 
-        except Exception as e:
-            logger.error(f"Vacuum failed: {e}")
-            console.print(f"[red]✗[/red] Vacuum failed: {e}")
-            raise typer.Exit(1)
+                if claim_exclusive_access(conn):
+                    # Write a compacted copy to the shadow path and swap it in
+                    # while the exclusive lock is still held
+                    shadow_path.unlink(missing_ok=True)
+                    conn.execute("VACUUM INTO ?", (str(shadow_path),))
+                    size_after = shadow_path.stat().st_size
+                    os.replace(shadow_path, db_path_obj)
+                else:
+                    console.print("[yellow]Database is in use by other connections; vacuuming in place[/yellow]")
+                    conn.execute("VACUUM")
+                    size_after = get_database_size(conn)
+
+            except Exception as e:
+                shadow_path.unlink(missing_ok=True)
+                logger.error(f"Vacuum failed: {e}")
+                console.print(f"[red]✗[/red] Vacuum failed: {e}")
+                raise typer.Exit(1)
+
+        console.print("[green]✓[/green] Database optimized successfully")
+
+    finally:
+        lock_path.unlink(missing_ok=True)
 
-    # Get size after
-    size_after = db_path_obj.stat().st_size / 1024 / 1024  # MB
     savings = size_before - size_after
 
-    console.print(f"Database size: {size_before:.2f} MB → {size_after:.2f} MB")
+    console.print(f"Database size: {format_mb(size_before)} → {format_mb(size_after)}")
     if savings > 0:
-        console.print(f"[green]Space reclaimed: {savings:.2f} MB[/green]")
+        console.print(f"[green]Space reclaimed: {format_mb(savings)}[/green]")
     else:
         console.print("No space reclaimed")
 
 
+def to_snake_case(text: str) -> str:
+    """Convert a tag or key to lowercase snake_case"""
+    # Values that went through canonicalization before are already clean
+    if _SNAKE_CASE_RE.fullmatch(text):
+        return text
+    # Split on non-alphanumeric characters and join with underscores
+    return '_'.join(_WORD_RE.findall(text.lower()))
+
+
 def canonicalize_tags(tags: List[str]) -> List[str]:
     """Convert tags to canonical format: lowercase, snake_case, deduplicated, sorted"""
     if not isinstance(tags, list):
@@ -881,10 +1044,7 @@ def canonicalize_tags(tags: List[str]) -> List[str]:
     for tag in tags:
         if isinstance(tag, str):
             # Convert to lowercase snake_case
-            import re
-            # Split on non-alphanumeric characters and join with underscores
-            words = re.findall(r'[a-zA-Z0-9]+', tag.lower())
-            canonical_tag = '_'.join(words)
+            canonical_tag = to_snake_case(tag)
             if canonical_tag:
                 canonical.append(canonical_tag)
 
@@ -892,43 +1052,26 @@ def canonicalize_tags(tags: List[str]) -> List[str]:
     return sorted(list(set(canonical)))
 
 
+def _canonical_io_key(raw_key: str) -> str:
+    """Snake_case an input/output key and apply the synonym mapping"""
+    key = to_snake_case(raw_key)
+    return _IO_SYNONYMS.get(key, key)
+
+
 def canonicalize_io_data(data: Any) -> Any:
     """Normalize inputs/outputs data structure and keys"""
     if not isinstance(data, dict):
         return data
 
-    # Common synonym mappings
-    synonyms = {
-        'epw': 'weather_epw',
-        'weather_file': 'weather_epw',
-        'weather': 'weather_epw',
-        'zone': 'zone_geojson',
-        'geometry': 'zone_geojson',
-        'district_geojson': 'zone_geojson',
-        'cost': 'cost_params',
-        'capex_opex': 'cost_params',
+    # Canonicalize each key and stringify any value that is not already
+    # JSON-serializable
+    return {
+        _canonical_io_key(key): (
+            value if isinstance(value, _JSON_PASSTHROUGH) else str(value)
+        )
+        for key, value in data.items()
     }
 
-    canonical = {}
-    for key, value in data.items():
-        # Convert key to snake_case
-        import re
-        words = re.findall(r'[a-zA-Z0-9]+', key.lower())
-        canonical_key = '_'.join(words)
-
-        # Apply synonym mapping
-        canonical_key = synonyms.get(canonical_key, canonical_key)
-
-        # Ensure value is JSON-serializable
-        if isinstance(value, (str, int, float, bool, type(None))):
-            canonical[canonical_key] = value
-        elif isinstance(value, (list, dict)):
-            canonical[canonical_key] = value
-        else:
-            canonical[canonical_key] = str(value)
-
-    return canonical
-
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
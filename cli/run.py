@@ -2,6 +2,7 @@ import asyncio
 import json
 import uuid
 from pathlib import Path
+from typing import Optional
 
 import typer
 from loguru import logger
@@ -20,12 +21,19 @@ from db import DAO, seed_database
 app = typer.Typer(help="CEA Assistant - Multi-agent system for CEA helper bot")
 console = Console()
 
+# Upper bound on a catalog refresh, in seconds
+CATALOG_REFRESH_TIMEOUT = 30.0
+
+# Placeholder shown in the plan table for steps without arguments
+NO_ARGUMENTS_MARKUP = "[dim]No arguments[/dim]"
+
 
 class CEAAssistant:
     def __init__(self) -> None:
         self.router = Router()
         self.dao = DAO()
         self.agents: list = []
+        self.dbm_agent: Optional[DatabaseManagerAgent] = None
 
     async def initialize(self) -> None:
         """Initialize the assistant and its components"""
@@ -38,7 +46,8 @@ class CEAAssistant:
         scripts = await self.dao.search_scripts()
         if not scripts:
             logger.info("Database is empty, seeding with sample data...")
-            await seed_database(self.dao)
+            # Forced: an emptied database may still record the seed as applied
+            await seed_database(self.dao, force=True)
 
         # Create agents
         chat_agent = ChatAgent(self.router)
@@ -46,13 +55,14 @@ class CEAAssistant:
         translator_agent = QueryTranslatorAgent(self.router, self.dao)
 
         self.agents = [chat_agent, dbm_agent, translator_agent]
+        self.dbm_agent = dbm_agent
 
         logger.info("CEA Assistant initialized successfully")
 
     async def start_agents(self) -> list:
         """Start all agents"""
         tasks = [asyncio.create_task(agent.run()) for agent in self.agents]
-        await asyncio.sleep(0.1)  # Give agents time to start
+        await asyncio.gather(*(agent.started.wait() for agent in self.agents))
         return tasks
 
     async def stop_agents(self) -> None:
@@ -64,43 +74,23 @@ class CEAAssistant:
         """Refresh the script catalog"""
         logger.info("Starting catalog refresh...")
 
-        conversation_id = str(uuid.uuid4())
-
-        # Create a temporary inbox for responses
-        refresh_inbox = asyncio.Queue()
-        self.router.register_agent("refresh_handler", refresh_inbox)
+        if self.dbm_agent is None:
+            raise RuntimeError("CEAAssistant.initialize() must be called before refresh_catalog()")
 
+        # The database manager runs in-process, so call it directly instead
+        # of routing a request/response pair through the message bus. The
+        # bus round-trip only delivered its INFORM to a temporary inbox owned
+        # by this method, so no other agent loses a notification.
         try:
-            # Send refresh request
-            refresh_message = Message.create(
-                performative=Performative.REQUEST,
-                sender="refresh_handler",
-                receiver="dbm",
-                conversation_id=conversation_id,
-                content_type="refresh_catalog",
-                content={},
+            result = await asyncio.wait_for(
+                self.dbm_agent.refresh_catalog(), timeout=CATALOG_REFRESH_TIMEOUT
             )
-
-            await self.router.route(refresh_message)
-
-            # Wait for response
-            timeout = 30.0  # 30 seconds timeout for catalog refresh
-            try:
-                response_message = await asyncio.wait_for(refresh_inbox.get(), timeout=timeout)
-
-                if response_message.content_type == "catalog_refreshed":
-                    return {"status": "completed", **response_message.content}
-                elif response_message.content_type == "error":
-                    return {"status": "error", **response_message.content}
-                else:
-                    return {"error": f"Unexpected response type: {response_message.content_type}"}
-
-            except asyncio.TimeoutError:
-                return {"error": "Catalog refresh timed out"}
-
-        finally:
-            # Clean up temporary inbox
-            self.router.unregister_agent("refresh_handler")
+            return {"status": "completed", **result}
+        except asyncio.TimeoutError:
+            return {"status": "error", "error": "Catalog refresh timed out"}
+        except Exception as e:
+            logger.error(f"Error refreshing catalog: {e}")
+            return {"status": "error", "error": f"Failed to refresh catalog: {str(e)}"}
 
     async def process_user_text(self, user_text: str, refresh_catalog: bool = False) -> dict:
         """Process user text and return the response"""
@@ -186,10 +176,7 @@ class CEAAssistant:
             # Cancel agent tasks
             for task in agent_tasks:
                 task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
+            await asyncio.gather(*agent_tasks, return_exceptions=True)
 
 
 def create_plan_table(plan_data: dict) -> Table:
@@ -202,16 +189,11 @@ def create_plan_table(plan_data: dict) -> Table:
     steps = plan_data.get("plan", [])
     for i, step in enumerate(steps, 1):
         script_id = step.get("script_id", "unknown")
-        args = step.get("args", {})
+        # Plans from the LLM may carry "args": null
+        args = step.get("args") or {}
 
         # Format arguments nicely
-        if args:
-            args_lines = []
-            for k, v in args.items():
-                args_lines.append(f"{k} = {v}")
-            args_text = "\n".join(args_lines)
-        else:
-            args_text = "[dim]No arguments[/dim]"
+        args_text = "\n".join(f"{k} = {v}" for k, v in args.items()) or NO_ARGUMENTS_MARKUP
 
         table.add_row(str(i), script_id, args_text)
 
@@ -292,8 +274,11 @@ def pretty_print_plan(result: dict):
 async def run_assistant(user_text: str, refresh: bool = False) -> dict:
     """Run the CEA assistant with a given user text"""
     assistant = CEAAssistant()
-    await assistant.initialize()
-    return await assistant.process_user_text(user_text, refresh_catalog=refresh)
+    try:
+        await assistant.initialize()
+        return await assistant.process_user_text(user_text, refresh_catalog=refresh)
+    finally:
+        await assistant.dao.close()
 
 
 @app.command()
@@ -318,10 +303,11 @@ def main(
             rotation="10 MB",
             level="DEBUG",
             format="{time} | {level} | {message}",
+            enqueue=True,
         )
     else:
+        # With no sinks at all loguru returns before formatting a record
         logger.remove()
-        logger.add(lambda msg: None)  # Suppress logs in non-verbose mode
 
     try:
         # Run the assistant
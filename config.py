@@ -3,8 +3,9 @@ Configuration management using pydantic-settings
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import ClassVar, Optional, Tuple
 
 from pydantic import Field, field_validator
 
@@ -17,12 +18,23 @@ except ImportError:
     dotenv.load_dotenv()
 
     class BaseSettings(BaseModel):
+        # (field_name, env_name) pairs, resolved once per subclass
+        _env_names: ClassVar[Tuple[Tuple[str, str], ...]] = ()
+
+        @classmethod
+        def __pydantic_init_subclass__(cls, **kwargs):
+            super().__pydantic_init_subclass__(**kwargs)
+            cls._env_names = tuple(
+                (field_name, field_info.alias or field_name.upper())
+                for field_name, field_info in cls.model_fields.items()
+            )
+
         def __init__(self, **kwargs):
             # Load from environment variables
-            for field_name, field_info in self.model_fields.items():
+            environ = os.environ
+            for field_name, env_name in self._env_names:
                 if field_name not in kwargs:
-                    env_name = field_info.alias or field_name.upper()
-                    env_value = os.getenv(env_name)
+                    env_value = environ.get(env_name)
                     if env_value is not None:
                         kwargs[field_name] = env_value
             super().__init__(**kwargs)
@@ -162,7 +174,8 @@ class Settings(BaseSettings):
                 "<level>{message}</level>"
             )
 
-        # Add console handler
+        # Add console handler (synchronous so it stays in order with the
+        # CLIs' own console output)
         logger.add(
             sink=lambda msg: print(msg, end=""),
             format=log_format,
@@ -170,7 +183,8 @@ class Settings(BaseSettings):
             colorize=True
         )
 
-        # Add file handler if configured
+        # Add file handler if configured; enqueued so writes, rotation and
+        # compression happen on a background thread, not in the caller
         if self.log_file:
             log_file_path = Path(self.log_file)
             log_file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -181,7 +195,8 @@ class Settings(BaseSettings):
                 level=self.log_level,
                 rotation="10 MB",
                 retention="10 days",
-                compression="gz"
+                compression="gz",
+                enqueue=True
             )
 
     def model_dump_safe(self) -> dict:
@@ -191,34 +206,31 @@ class Settings(BaseSettings):
         return data
 
 
-# Global settings instance
-try:
-    settings = Settings()
-except Exception as e:
-    print(f"❌ Configuration Error: {e}")
-    print("\nPlease check your environment variables:")
-    print("- CEA_ROOT: Path to CEA scripts directory")
-    print("- DB_PATH: Path to database file (optional)")
-    print("- LOG_LEVEL: Logging level - DEBUG, INFO, WARNING, ERROR, CRITICAL (optional)")
-    print("- SCRIPT_DISCOVERY_TIMEOUT: Timeout for script operations in seconds (optional)")
-    print("\nExample .env file:")
-    print("CEA_ROOT=./cea_scripts")
-    print("DB_PATH=./data/cea_assistant.db")
-    print("LOG_LEVEL=INFO")
-    print("SCRIPT_DISCOVERY_TIMEOUT=10.0")
-    raise SystemExit(1)
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get global settings instance"""
-    return settings
+    """Get global settings instance (environment is parsed once)"""
+    try:
+        return Settings()
+    except Exception as e:
+        print(f"❌ Configuration Error: {e}")
+        print("\nPlease check your environment variables:")
+        print("- CEA_ROOT: Path to CEA scripts directory")
+        print("- DB_PATH: Path to database file (optional)")
+        print("- LOG_LEVEL: Logging level - DEBUG, INFO, WARNING, ERROR, CRITICAL (optional)")
+        print("- SCRIPT_DISCOVERY_TIMEOUT: Timeout for script operations in seconds (optional)")
+        print("\nExample .env file:")
+        print("CEA_ROOT=./cea_scripts")
+        print("DB_PATH=./data/cea_assistant.db")
+        print("LOG_LEVEL=INFO")
+        print("SCRIPT_DISCOVERY_TIMEOUT=10.0")
+        raise SystemExit(1)
 
 
 def setup_logging(conversation_id: Optional[str] = None) -> None:
     """Setup logging using global settings"""
-    settings.setup_logging(conversation_id)
+    get_settings().setup_logging(conversation_id)
 
 
 # Setup logging on import
-if not settings.test_mode:
+if not get_settings().test_mode:
     setup_logging()
\ No newline at end of file
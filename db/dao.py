@@ -1,403 +1,852 @@
-import json
+import asyncio
+import re
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
 
 import aiosqlite
+import orjson
 from loguru import logger
-
-from .models import Script, ScriptSearchCriteria, Workflow, WorkflowSearchCriteria
+from pydantic import TypeAdapter, ValidationError
+
+from .models import (
+    Script,
+    ScriptInput,
+    ScriptOutput,
+    ScriptSearchCriteria,
+    Workflow,
+    WorkflowSearchCriteria,
+    WorkflowStep,
+)
+
+
+# Applied to every connection the DAO opens. journal_mode is persisted in the
+# database file; the rest are per-connection settings.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA wal_autocheckpoint = 1000",
+)
+
+# Upserts update conflicting rows in place: the rowid, created_at and any
+# unchanged index entries survive, and UPDATE triggers keep FTS in sync
+SCRIPT_UPSERT_SQL = """
+    INSERT INTO scripts
+    (id, name, path, cli, doc, inputs, outputs, tags, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        path = excluded.path,
+        cli = excluded.cli,
+        doc = excluded.doc,
+        inputs = excluded.inputs,
+        outputs = excluded.outputs,
+        tags = excluded.tags,
+        updated_at = excluded.updated_at
+"""
+
+WORKFLOW_UPSERT_SQL = """
+    INSERT INTO workflows
+    (id, name, description, steps, tags, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        steps = excluded.steps,
+        tags = excluded.tags,
+        updated_at = excluded.updated_at
+"""
+
+# Full-text indexes over the searchable columns, shared with schema
+# migration v2 so either path yields one schema. The update triggers only
+# fire when an indexed column actually changes: each firing deletes and
+# re-inserts the row's index entries, so upserts of unchanged rows and
+# writes to other columns (updated_at, path, cli) would otherwise churn
+# the index for nothing.
+FTS_SCHEMA = {
+    "scripts_fts": (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts
+        USING fts5(
+            id, name, doc, tags, inputs, outputs,
+            content='scripts',
+            content_rowid='rowid'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS scripts_ai AFTER INSERT ON scripts BEGIN
+            INSERT INTO scripts_fts(rowid, id, name, doc, tags, inputs, outputs)
+            VALUES (new.rowid, new.id, new.name, new.doc, new.tags, new.inputs, new.outputs);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS scripts_ad AFTER DELETE ON scripts BEGIN
+            INSERT INTO scripts_fts(scripts_fts, rowid, id, name, doc, tags, inputs, outputs)
+            VALUES ('delete', old.rowid, old.id, old.name, old.doc, old.tags, old.inputs, old.outputs);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS scripts_au AFTER UPDATE OF id, name, doc, tags, inputs, outputs ON scripts
+        WHEN old.id IS NOT new.id OR old.name IS NOT new.name OR old.doc IS NOT new.doc
+            OR old.tags IS NOT new.tags OR old.inputs IS NOT new.inputs OR old.outputs IS NOT new.outputs
+        BEGIN
+            INSERT INTO scripts_fts(scripts_fts, rowid, id, name, doc, tags, inputs, outputs)
+            VALUES ('delete', old.rowid, old.id, old.name, old.doc, old.tags, old.inputs, old.outputs);
+            INSERT INTO scripts_fts(rowid, id, name, doc, tags, inputs, outputs)
+            VALUES (new.rowid, new.id, new.name, new.doc, new.tags, new.inputs, new.outputs);
+        END
+        """,
+    ),
+    "workflows_fts": (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts
+        USING fts5(
+            id, name, description, tags, steps,
+            content='workflows',
+            content_rowid='rowid'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS workflows_ai AFTER INSERT ON workflows BEGIN
+            INSERT INTO workflows_fts(rowid, id, name, description, tags, steps)
+            VALUES (new.rowid, new.id, new.name, new.description, new.tags, new.steps);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS workflows_ad AFTER DELETE ON workflows BEGIN
+            INSERT INTO workflows_fts(workflows_fts, rowid, id, name, description, tags, steps)
+            VALUES ('delete', old.rowid, old.id, old.name, old.description, old.tags, old.steps);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS workflows_au AFTER UPDATE OF id, name, description, tags, steps ON workflows
+        WHEN old.id IS NOT new.id OR old.name IS NOT new.name OR old.description IS NOT new.description
+            OR old.tags IS NOT new.tags OR old.steps IS NOT new.steps
+        BEGIN
+            INSERT INTO workflows_fts(workflows_fts, rowid, id, name, description, tags, steps)
+            VALUES ('delete', old.rowid, old.id, old.name, old.description, old.tags, old.steps);
+            INSERT INTO workflows_fts(rowid, id, name, description, tags, steps)
+            VALUES (new.rowid, new.id, new.name, new.description, new.tags, new.steps);
+        END
+        """,
+    ),
+}
+
+# FTS5's unicode61 tokenizer splits on anything that is not a letter or digit
+_FTS_TOKEN_RE = re.compile(r"[^\W_]")
+
+
+def _fts_prefix_filter(column: str, text: str) -> Optional[str]:
+    """Build an FTS5 prefix-phrase filter on one column.
+
+    Returns None when ``text`` contains no indexable tokens, in which case
+    callers fall back to a LIKE filter.
+    """
+    if not _FTS_TOKEN_RE.search(text):
+        return None
+    phrase = text.replace('"', '""')
+    return f'{column} : "{phrase}" *'
+
+# Rows fetched per round-trip to the aiosqlite worker when streaming
+FETCH_CHUNK_SIZE = 250
+
+# Result sets at least this large are decoded into models on a worker thread
+# so Pydantic validation does not stall the event loop; smaller ones are not
+# worth the thread hand-off.
+DECODE_IN_THREAD_MIN_ROWS = 1000
+
+# Fixed column order for row decoding; rows are plain tuples
+SCRIPT_COLUMNS = "id, name, path, cli, doc, inputs, outputs, tags, created_at, updated_at"
+WORKFLOW_COLUMNS = "id, name, description, steps, tags, created_at, updated_at"
+
+
+# Fixed SQL text for the hot lookups. sqlite3 caches prepared statements per
+# connection keyed on the SQL string, so these are compiled once per DAO.
+# Tag lists are bound as one JSON array so the text does not vary with the
+# number of tags.
+SCRIPT_BY_ID_SQL = f"SELECT {SCRIPT_COLUMNS} FROM scripts WHERE id = ?"
+SCRIPTS_BY_IDS_SQL = f"SELECT {SCRIPT_COLUMNS} FROM scripts WHERE id IN (SELECT value FROM json_each(?))"
+WORKFLOW_BY_NAME_SQL = f"SELECT {WORKFLOW_COLUMNS} FROM workflows WHERE name = ?"
+SCRIPTS_BY_TAGS_SQL = f"""
+    SELECT {SCRIPT_COLUMNS} FROM scripts
+    WHERE id IN (
+        SELECT script_id FROM script_tags
+        WHERE tag IN (SELECT value FROM json_each(?))
+    )
+    ORDER BY name, id
+"""
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize to JSON text for a TEXT column (orjson returns bytes)"""
+    return orjson.dumps(obj).decode()
+
+
+def _load_json_list(value: Optional[str]) -> list:
+    """Decode a JSON column, treating NULL or malformed values as empty
+
+    The columns are NOT NULL DEFAULT '[]', so NULL only turns up in tables
+    created before that constraint and is handled on the error path rather
+    than with a check on every value.
+    """
+    try:
+        return orjson.loads(value)
+    except (orjson.JSONDecodeError, TypeError):
+        return []
+
+
+# Nested model lists are validated from and dumped to JSON text directly by
+# pydantic-core, without an intermediate list of dicts
+_SCRIPT_INPUTS = TypeAdapter(List[ScriptInput])
+_SCRIPT_OUTPUTS = TypeAdapter(List[ScriptOutput])
+_WORKFLOW_STEPS = TypeAdapter(List[WorkflowStep])
+
+
+def _load_model_list(adapter: TypeAdapter, value: Optional[str]) -> list:
+    """Validate a JSON list column, treating NULL or malformed JSON as empty"""
+    try:
+        return adapter.validate_json(value)
+    except ValidationError as e:
+        if e.errors()[0]["type"] in ("json_invalid", "json_type"):
+            return []
+        raise
+
+
+def _dump_model_list(adapter: TypeAdapter, models: list) -> str:
+    """Serialize a list of models for a TEXT column"""
+    return adapter.dump_json(models).decode()
+
+
+def _to_epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    """Store timestamps as integer Unix milliseconds"""
+    return int(value.timestamp() * 1000) if value else None
+
+
+def _load_timestamp(value: Optional[Union[int, str]]) -> Optional[datetime]:
+    """Decode an epoch-ms timestamp; ISO strings from older rows still parse"""
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value / 1000)
+    return datetime.fromisoformat(value) if value else None
+
+
+def _script_from_row(row: tuple) -> Script:
+    """Build a Script from a row selected with SCRIPT_COLUMNS"""
+    id_, name, path, cli, doc, inputs, outputs, tags, created_at, updated_at = row
+    tag_list = _load_json_list(tags)
+    script = Script(
+        id=id_,
+        name=name,
+        path=path,
+        cli=cli,
+        doc=doc,
+        inputs=_load_model_list(_SCRIPT_INPUTS, inputs),
+        outputs=_load_model_list(_SCRIPT_OUTPUTS, outputs),
+        tags=tag_list,
+        created_at=_load_timestamp(created_at),
+        updated_at=_load_timestamp(updated_at),
+    )
+    # Writing an unchanged model back reuses the stored tags text
+    if tag_list:
+        script.cache_tags_json(tags)
+    return script
+
+
+def _workflow_from_row(row: tuple) -> Workflow:
+    """Build a Workflow from a row selected with WORKFLOW_COLUMNS"""
+    id_, name, description, steps, tags, created_at, updated_at = row
+    tag_list = _load_json_list(tags)
+    workflow = Workflow(
+        id=id_,
+        name=name,
+        description=description,
+        steps=_load_model_list(_WORKFLOW_STEPS, steps),
+        tags=tag_list,
+        created_at=_load_timestamp(created_at),
+        updated_at=_load_timestamp(updated_at),
+    )
+    if tag_list:
+        workflow.cache_tags_json(tags)
+    return workflow
+
+
+def _models_from_rows(rows: List[tuple], from_row) -> list:
+    return [from_row(row) for row in rows]
+
+
+async def _decode_rows(rows: List[tuple], from_row) -> list:
+    """Build models from rows, off the event loop for large result sets"""
+    if len(rows) < DECODE_IN_THREAD_MIN_ROWS:
+        return _models_from_rows(rows, from_row)
+    return await asyncio.to_thread(_models_from_rows, rows, from_row)
 
 
 class DAO:
-    def __init__(self, db_path: str = "cea_assistant.db") -> None:
+    def __init__(self, db_path: str = "cea_assistant.db", read_only: bool = False) -> None:
         self.db_path = db_path
-        self._connection = None
+        # Read-only DAOs open the file with mode=ro, so they can run checks
+        # alongside a writer and can never take the write lock themselves
+        self.read_only = read_only
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        # One entry per active `async with`: whether that entry opened the
+        # connection (a stack so nested contexts on one DAO unwind correctly)
+        self._context_opened: List[bool] = []
+        # Set inside transaction(); the upsert methods then leave committing
+        # (or rolling back) to the end of the block
+        self._in_transaction = False
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self._connection = await aiosqlite.connect(self.db_path)
-        self._connection.row_factory = aiosqlite.Row
+        # Only a connection opened here is closed on exit, so entering a DAO
+        # that is already in use elsewhere does not pull it out from under
+        # the other owner
+        self._context_opened.append(self._connection is None)
+        await self._conn()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        if self._context_opened.pop():
+            await self.close()
+
+    async def _conn(self) -> aiosqlite.Connection:
+        """Get the shared connection, opening it on first use.
+
+        One long-lived connection per DAO avoids spawning a new aiosqlite
+        worker thread (and re-reading the schema) on every call. Whoever
+        creates the DAO owns it and should call close() (or use it as an
+        async context manager) when done.
+        """
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    if self.read_only:
+                        connection = aiosqlite.connect(
+                            f"file:{quote(str(self.db_path))}?mode=ro", uri=True
+                        )
+                    else:
+                        connection = aiosqlite.connect(self.db_path)
+                    # A DAO that is never closed must not keep the interpreter
+                    # alive at exit (aiosqlite < 0.20 is itself the Thread)
+                    getattr(connection, "_thread", connection).daemon = True
+                    await connection
+                    # WAL lets readers proceed alongside a writer and, with
+                    # synchronous=NORMAL, avoids an fsync on every commit
+                    try:
+                        for pragma in CONNECTION_PRAGMAS:
+                            # journal_mode is persisted in the file, so only a
+                            # writer may set it
+                            if self.read_only and "journal_mode" in pragma:
+                                continue
+                            await connection.execute(pragma)
+                    except Exception:
+                        await connection.close()
+                        raise
+                    self._connection = connection
+        return self._connection
+
+    async def close(self) -> None:
+        """Close the shared connection; the next call reopens it"""
         if self._connection:
             await self._connection.close()
             self._connection = None
 
     async def execute_query(self, query: str, params: tuple = None):
         """Execute a query and return cursor"""
-        if not self._connection:
-            raise RuntimeError("DAO must be used as async context manager")
-
+        db = await self._conn()
         if params:
-            return await self._connection.execute(query, params)
+            return await db.execute(query, params)
         else:
-            return await self._connection.execute(query)
+            return await db.execute(query)
+
+    async def execute_many(self, query: str, rows: List[tuple]):
+        """Execute a statement once per parameter tuple and return cursor"""
+        db = await self._conn()
+        return await db.executemany(query, rows)
 
     async def commit(self):
         """Commit current transaction"""
         if self._connection:
             await self._connection.commit()
 
+    async def rollback(self):
+        """Roll back current transaction"""
+        if self._connection:
+            await self._connection.rollback()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["DAO"]:
+        """Group several writes into one transaction with a single commit.
+
+        Upserts, initialize() and recreate_tables() called inside the block
+        join it instead of committing on their own; an exception rolls all
+        of them back. Nested blocks join the outermost one.
+        """
+        if self._in_transaction:
+            yield self
+            return
+
+        db = await self._conn()
+        await db.execute("BEGIN IMMEDIATE")
+        self._in_transaction = True
+        try:
+            yield self
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
+    async def _finish_write(self, db: aiosqlite.Connection) -> None:
+        """Commit a write unless it belongs to an enclosing transaction()"""
+        if not self._in_transaction:
+            await db.commit()
+
     async def initialize(self) -> None:
         """Initialize the database with schema"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Create scripts table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS scripts (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    path TEXT NOT NULL,
-                    cli TEXT,
-                    doc TEXT,
-                    inputs TEXT,
-                    outputs TEXT,
-                    tags TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
+        db = await self._conn()
+        # Create scripts table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS scripts (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                path TEXT NOT NULL,
+                cli TEXT,
+                doc TEXT,
+                inputs TEXT NOT NULL DEFAULT '[]',
+                outputs TEXT NOT NULL DEFAULT '[]',
+                tags TEXT NOT NULL DEFAULT '[]',
+                created_at INTEGER DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)),
+                updated_at INTEGER DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+            )
+        """)
+
+        # Create workflows table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT,
+                steps TEXT NOT NULL,
+                tags TEXT NOT NULL DEFAULT '[]',
+                created_at INTEGER DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)),
+                updated_at INTEGER DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+            )
+        """)
+
+        # Digest of the seed data last applied, so an unchanged reseed is skipped
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS seed_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hash TEXT NOT NULL
+            )
+        """)
+
+        # Create indexes. Listings are ordered by (name, id), so the name
+        # indexes carry id as well and paging walks the index without a sort;
+        # they supersede the older single-column name indexes.
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_scripts_name_id ON scripts(name, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_scripts_tags ON scripts(tags)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_workflows_name_id ON workflows(name, id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_workflows_tags ON workflows(tags)")
+        await db.execute("DROP INDEX IF EXISTS idx_scripts_name")
+        await db.execute("DROP INDEX IF EXISTS idx_workflows_name")
+
+        # Normalized tag tables so tag lookups are index probes instead of
+        # LIKE scans over the JSON column
+        for table, key in (("scripts", "script_id"), ("workflows", "workflow_id")):
+            await self._create_tag_table(db, table, key)
+
+        # Full-text indexes for name/description search. The BEFORE INSERT
+        # triggers that covered INSERT OR REPLACE would now delete index
+        # entries twice on upsert, so drop them from older databases.
+        await db.execute("DROP TRIGGER IF EXISTS scripts_bi")
+        await db.execute("DROP TRIGGER IF EXISTS workflows_bi")
+        # Update triggers from before they were limited to indexed-column
+        # changes are replaced by the definitions below
+        cursor = await db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND name IN ('scripts_au', 'workflows_au') AND sql NOT LIKE '%AFTER UPDATE OF%'"
+        )
+        for (trigger,) in await cursor.fetchall():
+            await db.execute(f"DROP TRIGGER {trigger}")
+        for fts_table, statements in FTS_SCHEMA.items():
+            cursor = await db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+            )
+            exists = await cursor.fetchone() is not None
+            for statement in statements:
+                await db.execute(statement)
+            if not exists:
+                await db.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES('rebuild')")
+
+        await self._finish_write(db)
+        logger.info("Database initialized successfully")
+
+    @staticmethod
+    async def _create_tag_table(db: aiosqlite.Connection, table: str, key: str) -> None:
+        """Create the ``<table>_tags`` side table and the triggers that fill it.
+
+        Triggers (rather than DAO code) keep the side table in sync, so rows
+        rewritten by the maintenance CLI or migrations stay searchable. The
+        insert trigger clears stale rows first because INSERT OR REPLACE does
+        not fire delete triggers. Tags compare case-insensitively, as the old
+        LIKE filter did.
+        """
+        tag_table = f"{table[:-1]}_tags"
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tag_table,)
+        )
+        exists = await cursor.fetchone() is not None
+
+        tag_values = "json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END)"
+        await db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {tag_table} (
+                {key} TEXT NOT NULL,
+                tag TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY ({key}, tag)
+            ) WITHOUT ROWID
+        """)
+        await db.execute(f"CREATE INDEX IF NOT EXISTS idx_{tag_table}_tag ON {tag_table}(tag)")
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tag_table}_ai AFTER INSERT ON {table} BEGIN
+                DELETE FROM {tag_table} WHERE {key} = new.id;
+                INSERT OR IGNORE INTO {tag_table} ({key}, tag)
+                SELECT new.id, value FROM {tag_values};
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tag_table}_au AFTER UPDATE OF id, tags ON {table} BEGIN
+                DELETE FROM {tag_table} WHERE {key} = old.id;
+                INSERT OR IGNORE INTO {tag_table} ({key}, tag)
+                SELECT new.id, value FROM {tag_values};
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tag_table}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM {tag_table} WHERE {key} = old.id;
+            END
+        """)
+
+        if not exists:
+            # Backfill rows written before the side table existed
+            await db.execute(f"""
+                INSERT OR IGNORE INTO {tag_table} ({key}, tag)
+                SELECT t.id, j.value FROM {table} t, json_each(t.tags) j
+                WHERE json_valid(t.tags)
             """)
 
-            # Create workflows table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS workflows (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    steps TEXT NOT NULL,
-                    tags TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create indexes
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_scripts_name ON scripts(name)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_scripts_tags ON scripts(tags)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_workflows_name ON workflows(name)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_workflows_tags ON workflows(tags)")
-
-            await db.commit()
-            logger.info("Database initialized successfully")
-
     async def recreate_tables(self) -> None:
         """Drop and recreate all tables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        db = await self._conn()
+        # sqlite3 does not open transactions for DDL on its own; one explicit
+        # transaction covers the drops and the schema that initialize()
+        # recreates and commits, so readers never see a half-built schema.
+        # Inside transaction() the enclosing block owns the transaction.
+        if not self._in_transaction:
+            await db.execute("BEGIN")
+        try:
             # Drop existing tables
             await db.execute("DROP TABLE IF EXISTS scripts")
             await db.execute("DROP TABLE IF EXISTS workflows")
-            await db.commit()
+            await db.execute("DROP TABLE IF EXISTS script_tags")
+            await db.execute("DROP TABLE IF EXISTS workflow_tags")
+            await db.execute("DROP TABLE IF EXISTS scripts_fts")
+            await db.execute("DROP TABLE IF EXISTS workflows_fts")
+            await db.execute("DROP TABLE IF EXISTS seed_state")
             logger.info("Dropped existing tables")
 
-        # Recreate tables
-        await self.initialize()
+            # Recreate tables
+            await self.initialize()
+        except Exception:
+            if not self._in_transaction:
+                await db.rollback()
+            raise
+
+    async def get_seed_hash(self) -> Optional[str]:
+        """Digest of the seed data last applied, or None if never seeded"""
+        db = await self._conn()
+        cursor = await db.execute("SELECT hash FROM seed_state WHERE id = 1")
+        row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_seed_hash(self, digest: str) -> None:
+        """Record the digest of the seed data just applied"""
+        db = await self._conn()
+        await db.execute(
+            "INSERT INTO seed_state (id, hash) VALUES (1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET hash = excluded.hash",
+            (digest,),
+        )
+        await self._finish_write(db)
+
+    @staticmethod
+    def _script_row(script: Script, now: datetime, now_ms: int) -> tuple:
+        """Assign ID/timestamps and build the INSERT parameters for a script"""
+        if script.id is None:
+            script.id = str(uuid.uuid4())
+            script.created_at = now
+
+        script.updated_at = now
+
+        return (
+            script.id,
+            script.name,
+            script.path,
+            script.cli,
+            script.doc,
+            _dump_model_list(_SCRIPT_INPUTS, script.inputs),
+            _dump_model_list(_SCRIPT_OUTPUTS, script.outputs),
+            script.tags_json(),
+            _to_epoch_ms(script.created_at),
+            now_ms,
+        )
+
+    async def upsert_scripts(self, scripts: List[Script]) -> List[str]:
+        """Insert or update several scripts in one transaction"""
+        # One clock read for the whole batch
+        now = datetime.now()
+        now_ms = int(now.timestamp() * 1000)
+        rows = [self._script_row(script, now, now_ms) for script in scripts]
+        if not rows:
+            return []
+
+        db = await self._conn()
+        # sqlite3 opens the transaction implicitly before the first INSERT,
+        # so the whole batch shares one statement and one commit
+        try:
+            await db.executemany(SCRIPT_UPSERT_SQL, rows)
+            await self._finish_write(db)
+        except Exception:
+            if not self._in_transaction:
+                await db.rollback()
+            raise
+        return [row[0] for row in rows]
 
     async def upsert_script(self, script: Script) -> str:
         """Insert or update a script"""
-        if script.id is None:
-            script.id = str(uuid.uuid4())
-            script.created_at = datetime.now()
-
-        script.updated_at = datetime.now()
-
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT OR REPLACE INTO scripts
-                (id, name, path, cli, doc, inputs, outputs, tags, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                script.id,
-                script.name,
-                script.path,
-                script.cli,
-                script.doc,
-                json.dumps([input.model_dump() for input in script.inputs]),
-                json.dumps([output.model_dump() for output in script.outputs]),
-                json.dumps(script.tags),
-                script.created_at.isoformat() if script.created_at else None,
-                script.updated_at.isoformat() if script.updated_at else None,
-            ))
-            await db.commit()
-            logger.info(f"Upserted script: {script.name} (ID: {script.id})")
-            return script.id
+        await self.upsert_scripts([script])
+        logger.info(f"Upserted script: {script.name} (ID: {script.id})")
+        return script.id
 
     async def find_scripts_by_tags(self, tags: List[str]) -> List[Script]:
         """Find scripts that match any of the given tags"""
         if not tags:
             return []
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-
-            # Build query to find scripts with any matching tags
-            placeholders = ",".join("?" for _ in tags)
-            sql = f"""
-                SELECT * FROM scripts
-                WHERE id IN (
-                    SELECT DISTINCT s.id FROM scripts s
-                    WHERE {" OR ".join("s.tags LIKE ?" for _ in tags)}
-                )
-                ORDER BY name
-            """
-
-            # Create LIKE patterns for tag matching
-            params = [f'%"{tag}"%' for tag in tags]
-
-            cursor = await db.execute(sql, params)
-            rows = await cursor.fetchall()
-
-            scripts = []
-            for row in rows:
-                script_data = dict(row)
-                # Handle potentially invalid JSON gracefully
-                try:
-                    script_data["inputs"] = json.loads(script_data["inputs"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["inputs"] = []
-
-                try:
-                    script_data["outputs"] = json.loads(script_data["outputs"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["outputs"] = []
-
-                try:
-                    script_data["tags"] = json.loads(script_data["tags"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["tags"] = []
-
-                # Convert to datetime objects
-                if script_data["created_at"]:
-                    script_data["created_at"] = datetime.fromisoformat(script_data["created_at"])
-                if script_data["updated_at"]:
-                    script_data["updated_at"] = datetime.fromisoformat(script_data["updated_at"])
-
-                scripts.append(Script(**script_data))
-
-            logger.info(f"Found {len(scripts)} scripts matching tags: {tags}")
-            return scripts
+        db = await self._conn()
+        cursor = await db.execute(SCRIPTS_BY_TAGS_SQL, (_dumps(tags),))
+        rows = await cursor.fetchall()
 
-    async def search_scripts(self, criteria: Optional[ScriptSearchCriteria] = None) -> List[Script]:
-        """Search scripts with flexible criteria"""
-        if criteria is None:
-            criteria = ScriptSearchCriteria()
-
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-
-            sql = "SELECT * FROM scripts WHERE 1=1"
-            params = []
-
-            if criteria.name:
-                sql += " AND name LIKE ?"
-                params.append(f"%{criteria.name}%")
+        scripts = [_script_from_row(row) for row in rows]
 
-            if criteria.description:
-                sql += " AND doc LIKE ?"
-                params.append(f"%{criteria.description}%")
+        logger.info(f"Found {len(scripts)} scripts matching tags: {tags}")
+        return scripts
 
-            if criteria.tags:
-                tag_conditions = []
-                for tag in criteria.tags:
-                    tag_conditions.append("tags LIKE ?")
-                    params.append(f'%"{tag}"%')
-                sql += f" AND ({' OR '.join(tag_conditions)})"
-
-            sql += " ORDER BY name"
-
-            if criteria.limit:
-                sql += " LIMIT ?"
-                params.append(criteria.limit)
+    @staticmethod
+    def _scripts_query(criteria: Optional[ScriptSearchCriteria]) -> Tuple[str, list]:
+        """Build the SQL and parameters for a script search"""
+        if criteria is None:
+            criteria = ScriptSearchCriteria()
 
-            if criteria.offset:
-                sql += " OFFSET ?"
-                params.append(criteria.offset)
+        sql = f"SELECT {SCRIPT_COLUMNS} FROM scripts WHERE 1=1"
+        params = []
+
+        # Name/description filters are FTS prefix matches; text without
+        # indexable tokens falls back to a substring scan
+        fts_filters = []
+        for column, text in (("name", criteria.name), ("doc", criteria.description)):
+            if not text:
+                continue
+            fts_filter = _fts_prefix_filter(column, text)
+            if fts_filter:
+                fts_filters.append(fts_filter)
+            else:
+                sql += f" AND {column} LIKE ?"
+                params.append(f"%{text}%")
+
+        if fts_filters:
+            sql += " AND rowid IN (SELECT rowid FROM scripts_fts WHERE scripts_fts MATCH ?)"
+            params.append(" AND ".join(fts_filters))
+
+        if criteria.tags:
+            sql += " AND id IN (SELECT script_id FROM script_tags WHERE tag IN (SELECT value FROM json_each(?)))"
+            params.append(_dumps(criteria.tags))
+
+        # LIMIT/OFFSET are always bound (-1 means no limit) so paging does
+        # not multiply the number of distinct statements
+        sql += " ORDER BY name, id LIMIT ? OFFSET ?"
+        params.extend((criteria.limit or -1, criteria.offset or 0))
+
+        return sql, params
 
-            cursor = await db.execute(sql, params)
-            rows = await cursor.fetchall()
+    async def search_scripts(self, criteria: Optional[ScriptSearchCriteria] = None) -> List[Script]:
+        """Search scripts with flexible criteria"""
+        sql, params = self._scripts_query(criteria)
+        db = await self._conn()
+        cursor = await db.execute(sql, params)
+        rows = await cursor.fetchall()
+
+        return await _decode_rows(rows, _script_from_row)
+
+    async def iter_scripts(
+        self, criteria: Optional[ScriptSearchCriteria] = None, chunk_size: int = FETCH_CHUNK_SIZE
+    ) -> AsyncIterator[Script]:
+        """Yield matching scripts a chunk of rows at a time to bound memory"""
+        sql, params = self._scripts_query(criteria)
+        db = await self._conn()
+        async with db.execute(sql, params) as cursor:
+            while rows := await cursor.fetchmany(chunk_size):
+                for row in rows:
+                    yield _script_from_row(row)
 
-            scripts = []
-            for row in rows:
-                script_data = dict(row)
-                # Handle potentially invalid JSON gracefully
-                try:
-                    script_data["inputs"] = json.loads(script_data["inputs"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["inputs"] = []
+    async def get_script_by_id(self, script_id: str) -> Optional[Script]:
+        """Get a script by its ID"""
+        db = await self._conn()
+        cursor = await db.execute(SCRIPT_BY_ID_SQL, (script_id,))
+        row = await cursor.fetchone()
 
-                try:
-                    script_data["outputs"] = json.loads(script_data["outputs"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["outputs"] = []
+        return _script_from_row(row) if row else None
 
-                try:
-                    script_data["tags"] = json.loads(script_data["tags"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["tags"] = []
+    async def get_scripts_by_ids(self, script_ids: Sequence[str]) -> Dict[str, Script]:
+        """Get the scripts with the given IDs in one query, keyed by ID
 
-                # Convert to datetime objects
-                if script_data["created_at"]:
-                    script_data["created_at"] = datetime.fromisoformat(script_data["created_at"])
-                if script_data["updated_at"]:
-                    script_data["updated_at"] = datetime.fromisoformat(script_data["updated_at"])
+        IDs without a script are absent from the result.
+        """
+        db = await self._conn()
+        cursor = await db.execute(SCRIPTS_BY_IDS_SQL, (_dumps(list(script_ids)),))
+        rows = await cursor.fetchall()
 
-                scripts.append(Script(**script_data))
+        return {script.id: script for script in await _decode_rows(rows, _script_from_row)}
 
-            return scripts
+    @staticmethod
+    def _workflow_row(workflow: Workflow, now: datetime, now_ms: int) -> tuple:
+        """Assign ID/timestamps and build the INSERT parameters for a workflow"""
+        if workflow.id is None:
+            workflow.id = str(uuid.uuid4())
+            workflow.created_at = now
+
+        workflow.updated_at = now
+
+        return (
+            workflow.id,
+            workflow.name,
+            workflow.description,
+            _dump_model_list(_WORKFLOW_STEPS, workflow.steps),
+            workflow.tags_json(),
+            _to_epoch_ms(workflow.created_at),
+            now_ms,
+        )
+
+    async def upsert_workflows(self, workflows: List[Workflow]) -> List[str]:
+        """Insert or update several workflows in one transaction"""
+        # One clock read for the whole batch
+        now = datetime.now()
+        now_ms = int(now.timestamp() * 1000)
+        rows = [self._workflow_row(workflow, now, now_ms) for workflow in workflows]
+        if not rows:
+            return []
 
-    async def get_script_by_id(self, script_id: str) -> Optional[Script]:
-        """Get a script by its ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("SELECT * FROM scripts WHERE id = ?", (script_id,))
-            row = await cursor.fetchone()
-
-            if row:
-                script_data = dict(row)
-                # Handle potentially invalid JSON gracefully
-                try:
-                    script_data["inputs"] = json.loads(script_data["inputs"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["inputs"] = []
-
-                try:
-                    script_data["outputs"] = json.loads(script_data["outputs"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["outputs"] = []
-
-                try:
-                    script_data["tags"] = json.loads(script_data["tags"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    script_data["tags"] = []
-
-                # Convert to datetime objects
-                if script_data["created_at"]:
-                    script_data["created_at"] = datetime.fromisoformat(script_data["created_at"])
-                if script_data["updated_at"]:
-                    script_data["updated_at"] = datetime.fromisoformat(script_data["updated_at"])
-
-                return Script(**script_data)
-            return None
+        db = await self._conn()
+        try:
+            await db.executemany(WORKFLOW_UPSERT_SQL, rows)
+            await self._finish_write(db)
+        except Exception:
+            if not self._in_transaction:
+                await db.rollback()
+            raise
+        return [row[0] for row in rows]
 
     async def upsert_workflow(self, workflow: Workflow) -> str:
         """Insert or update a workflow"""
-        if workflow.id is None:
-            workflow.id = str(uuid.uuid4())
-            workflow.created_at = datetime.now()
-
-        workflow.updated_at = datetime.now()
-
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT OR REPLACE INTO workflows
-                (id, name, description, steps, tags, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                workflow.id,
-                workflow.name,
-                workflow.description,
-                json.dumps([step.model_dump() for step in workflow.steps]),
-                json.dumps(workflow.tags),
-                workflow.created_at.isoformat() if workflow.created_at else None,
-                workflow.updated_at.isoformat() if workflow.updated_at else None,
-            ))
-            await db.commit()
-            logger.info(f"Upserted workflow: {workflow.name} (ID: {workflow.id})")
-            return workflow.id
+        await self.upsert_workflows([workflow])
+        logger.info(f"Upserted workflow: {workflow.name} (ID: {workflow.id})")
+        return workflow.id
 
     async def get_workflow_by_name(self, name: str) -> Optional[Workflow]:
         """Get a workflow by its name"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("SELECT * FROM workflows WHERE name = ?", (name,))
-            row = await cursor.fetchone()
-
-            if row:
-                workflow_data = dict(row)
-                # Handle potentially invalid JSON gracefully
-                try:
-                    workflow_data["steps"] = json.loads(workflow_data["steps"])
-                except (json.JSONDecodeError, TypeError):
-                    workflow_data["steps"] = []
-
-                try:
-                    workflow_data["tags"] = json.loads(workflow_data["tags"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    workflow_data["tags"] = []
-
-                # Convert to datetime objects
-                if workflow_data["created_at"]:
-                    workflow_data["created_at"] = datetime.fromisoformat(workflow_data["created_at"])
-                if workflow_data["updated_at"]:
-                    workflow_data["updated_at"] = datetime.fromisoformat(workflow_data["updated_at"])
-
-                return Workflow(**workflow_data)
-            return None
+        db = await self._conn()
+        cursor = await db.execute(WORKFLOW_BY_NAME_SQL, (name,))
+        row = await cursor.fetchone()
 
-    async def search_workflows(self, criteria: Optional[WorkflowSearchCriteria] = None) -> List[Workflow]:
-        """Search workflows with flexible criteria"""
+        return _workflow_from_row(row) if row else None
+
+    @staticmethod
+    def _workflows_query(criteria: Optional[WorkflowSearchCriteria]) -> Tuple[str, list]:
+        """Build the SQL and parameters for a workflow search"""
         if criteria is None:
             criteria = WorkflowSearchCriteria()
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-
-            sql = "SELECT * FROM workflows WHERE 1=1"
-            params = []
-
-            if criteria.name:
-                sql += " AND name LIKE ?"
-                params.append(f"%{criteria.name}%")
-
-            if criteria.description:
-                sql += " AND description LIKE ?"
-                params.append(f"%{criteria.description}%")
-
-            if criteria.tags:
-                tag_conditions = []
-                for tag in criteria.tags:
-                    tag_conditions.append("tags LIKE ?")
-                    params.append(f'%"{tag}"%')
-                sql += f" AND ({' OR '.join(tag_conditions)})"
-
-            sql += " ORDER BY name"
-
-            if criteria.limit:
-                sql += " LIMIT ?"
-                params.append(criteria.limit)
-
-            if criteria.offset:
-                sql += " OFFSET ?"
-                params.append(criteria.offset)
+        sql = f"SELECT {WORKFLOW_COLUMNS} FROM workflows WHERE 1=1"
+        params = []
+
+        # Name/description filters are FTS prefix matches; text without
+        # indexable tokens falls back to a substring scan
+        fts_filters = []
+        for column, text in (("name", criteria.name), ("description", criteria.description)):
+            if not text:
+                continue
+            fts_filter = _fts_prefix_filter(column, text)
+            if fts_filter:
+                fts_filters.append(fts_filter)
+            else:
+                sql += f" AND {column} LIKE ?"
+                params.append(f"%{text}%")
+
+        if fts_filters:
+            sql += " AND rowid IN (SELECT rowid FROM workflows_fts WHERE workflows_fts MATCH ?)"
+            params.append(" AND ".join(fts_filters))
+
+        if criteria.tags:
+            sql += " AND id IN (SELECT workflow_id FROM workflow_tags WHERE tag IN (SELECT value FROM json_each(?)))"
+            params.append(_dumps(criteria.tags))
+
+        # LIMIT/OFFSET are always bound (-1 means no limit) so paging does
+        # not multiply the number of distinct statements
+        sql += " ORDER BY name, id LIMIT ? OFFSET ?"
+        params.extend((criteria.limit or -1, criteria.offset or 0))
+
+        return sql, params
 
-            cursor = await db.execute(sql, params)
-            rows = await cursor.fetchall()
-
-            workflows = []
-            for row in rows:
-                workflow_data = dict(row)
-                # Handle potentially invalid JSON gracefully
-                try:
-                    workflow_data["steps"] = json.loads(workflow_data["steps"])
-                except (json.JSONDecodeError, TypeError):
-                    workflow_data["steps"] = []
-
-                try:
-                    workflow_data["tags"] = json.loads(workflow_data["tags"] or "[]")
-                except (json.JSONDecodeError, TypeError):
-                    workflow_data["tags"] = []
-
-                # Convert to datetime objects
-                if workflow_data["created_at"]:
-                    workflow_data["created_at"] = datetime.fromisoformat(workflow_data["created_at"])
-                if workflow_data["updated_at"]:
-                    workflow_data["updated_at"] = datetime.fromisoformat(workflow_data["updated_at"])
-
-                workflows.append(Workflow(**workflow_data))
-
-            return workflows
+    async def search_workflows(self, criteria: Optional[WorkflowSearchCriteria] = None) -> List[Workflow]:
+        """Search workflows with flexible criteria"""
+        sql, params = self._workflows_query(criteria)
+        db = await self._conn()
+        cursor = await db.execute(sql, params)
+        rows = await cursor.fetchall()
+
+        return await _decode_rows(rows, _workflow_from_row)
+
+    async def iter_workflows(
+        self, criteria: Optional[WorkflowSearchCriteria] = None, chunk_size: int = FETCH_CHUNK_SIZE
+    ) -> AsyncIterator[Workflow]:
+        """Yield matching workflows a chunk of rows at a time to bound memory"""
+        sql, params = self._workflows_query(criteria)
+        db = await self._conn()
+        async with db.execute(sql, params) as cursor:
+            while rows := await cursor.fetchmany(chunk_size):
+                for row in rows:
+                    yield _workflow_from_row(row)
+
+    async def count_scripts(self) -> int:
+        """Number of scripts in the database"""
+        db = await self._conn()
+        cursor = await db.execute("SELECT COUNT(*) FROM scripts")
+        return (await cursor.fetchone())[0]
+
+    async def count_workflows(self) -> int:
+        """Number of workflows in the database"""
+        db = await self._conn()
+        cursor = await db.execute("SELECT COUNT(*) FROM workflows")
+        return (await cursor.fetchone())[0]
 
     async def get_all_scripts(self) -> List[Script]:
         """Get all scripts in the database"""
@@ -1,17 +1,139 @@
 """Database migration system with schema versioning."""
 
 import asyncio
-import json
 import sqlite3
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 import logging
 
-from .dao import DAO
+import orjson
+
+from .dao import DAO, FETCH_CHUNK_SIZE, FTS_SCHEMA
 
 logger = logging.getLogger(__name__)
 
+# Tag arrays made only of printable-ASCII strings normalize the same way in
+# SQLite as in Python (SQLite's lower() and trim() are ASCII-only), so those
+# rows are normalized set-based in SQL; anything else takes the Python path.
+SQL_NORMALIZABLE_TAGS = """
+    CASE WHEN json_valid(tags) THEN
+        json_type(tags) = 'array'
+        AND NOT EXISTS (
+            SELECT 1 FROM json_each(tags) WHERE type <> 'text' OR value GLOB '*[^ -~]*'
+        )
+    ELSE 0 END
+"""
+
+
+def _normalized_tags_cte(table: str) -> str:
+    """CTE pairing each SQL-normalizable row's tags with their normalized form.
+
+    old_tags re-serializes the decoded array so escaping differences in the
+    stored text do not count as a change.
+    """
+    return f"""
+        WITH normalized AS (
+            SELECT id,
+                   (SELECT json_group_array(tag) FROM (
+                        SELECT DISTINCT lower(trim(value)) AS tag FROM json_each(tags)
+                        WHERE trim(value) <> '' ORDER BY tag
+                   )) AS new_tags,
+                   (SELECT json_group_array(value) FROM json_each(tags)) AS old_tags
+            FROM {table}
+            WHERE {SQL_NORMALIZABLE_TAGS}
+        )
+    """
+
+
+def _sql_normalizable_items(column: str) -> str:
+    """Predicate for inputs/outputs arrays SQLite can normalize like Python.
+
+    Every item must be an object of scalar fields with an ASCII text
+    ``type`` (if any): nested values would need their keys sorted
+    recursively, and floats could be re-rendered differently.
+    """
+    return f"""
+        CASE WHEN json_valid({column}) THEN
+            json_type({column}) = 'array'
+            AND NOT EXISTS (
+                SELECT 1 FROM json_each({column}) AS item
+                WHERE item.type <> 'object' OR EXISTS (
+                    SELECT 1 FROM json_each(item.value) AS field
+                    WHERE field.type NOT IN ('text', 'integer', 'true', 'false', 'null')
+                       OR (field.key = 'type' AND (field.type <> 'text' OR field.value GLOB '*[^ -~]*'))
+                )
+            )
+        ELSE 0 END
+    """
+
+
+def _normalized_items_cte(column: str) -> str:
+    """CTE pairing each SQL-normalizable script whose item types need
+    normalizing with the rewritten ``column`` array.
+
+    Types are lowercased without surrounding dots and each item is rebuilt
+    with its keys sorted, matching the Python path's OPT_SORT_KEYS output.
+    """
+    return f"""
+        WITH normalized AS (
+            SELECT id,
+                   (SELECT json_group_array(json((
+                        SELECT json_group_object(key, CASE
+                            WHEN key = 'type' THEN lower(trim(value, '.'))
+                            WHEN type IN ('true', 'false') THEN json(type)
+                            ELSE value END)
+                        FROM (SELECT key, value, type FROM json_each(item.value) ORDER BY key)
+                   ))) FROM json_each(scripts.{column}) AS item) AS new_value
+            FROM scripts
+            WHERE {_sql_normalizable_items(column)} AND EXISTS (
+                SELECT 1 FROM json_each(scripts.{column}) AS item, json_each(item.value) AS field
+                WHERE field.key = 'type' AND lower(trim(field.value, '.')) <> field.value
+            )
+        )
+    """
+
+
+# Fixed UPDATE text for each column normalize_data rewrites. sqlite3 caches
+# prepared statements per connection keyed on the SQL string, so each is
+# compiled once and reused by its executemany.
+SCRIPT_COLUMN_UPDATES = {
+    field_name: f"UPDATE scripts SET {field_name} = ? WHERE id = ?"
+    for field_name in ("tags", "inputs", "outputs")
+}
+WORKFLOW_TAGS_UPDATE = "UPDATE workflows SET tags = ? WHERE id = ?"
+
+# What each migration would do, reported by migrate(dry_run=True)
+MIGRATION_PLANS = {
+    1: [
+        "Migration to v1: Add schema versioning",
+        "- Would create schema_version table",
+    ],
+    2: [
+        "Migration to v2: Add FTS5 and performance indexes",
+        "- Would create FTS5 virtual tables",
+        "- Would create FTS sync triggers",
+        "- Would populate FTS with existing data",
+        "- Would add performance indexes",
+        "- Would refresh query planner statistics",
+    ],
+}
+
+# Columns each FTS table indexes after id and name, with the value a column
+# indexes as when an older schema lacks it
+FTS_COLUMN_DEFAULTS = {
+    "scripts": (("doc", ""), ("tags", "[]"), ("inputs", "[]"), ("outputs", "[]")),
+    "workflows": (("description", ""), ("tags", "[]"), ("steps", "[]")),
+}
+
+
+def _column_or_default(columns: Set[str], column: str, default: str) -> str:
+    """SQL expression for a column that older schemas may lack."""
+    if column in columns:
+        return f"COALESCE({column}, '{default}')"
+    return f"'{default}'"
+
+
 class MigrationManager:
     """Manages database schema migrations with versioning."""
 
@@ -19,41 +141,108 @@ class MigrationManager:
         self.db_path = db_path
         self.migrations_dir = Path(__file__).parent / "migrations"
         self.migrations_dir.mkdir(exist_ok=True)
+        # Every method enters this DAO; inside migrate() it is already open,
+        # so all steps share one connection instead of reconnecting per step
+        self._dao = DAO(db_path)
+        # Serializes the write paths (migrate, normalize_data,
+        # set_schema_version) so two of them never interleave transactions
+        # on the shared connection; read-only checks do not take it
+        self._write_lock = asyncio.Lock()
+        # Last version read from or written to schema_version; this manager
+        # is the only writer for the length of a migrate() run
+        self._schema_version: Optional[int] = None
+
+    def _record_schema_version(self, version: int) -> None:
+        """Update the cached version after a schema_version row is written."""
+        if self._schema_version is not None:
+            self._schema_version = max(self._schema_version, version)
 
     async def get_schema_version(self) -> int:
         """Get current schema version from database."""
+        if self._schema_version is not None:
+            return self._schema_version
+
         try:
-            async with DAO(self.db_path) as dao:
-                cursor = await dao.execute_query(
-                    "SELECT MAX(version) FROM schema_version"
-                )
-                result = await cursor.fetchone()
-                return result[0] if result and result[0] is not None else 0
+            async with self._dao as dao:
+                self._schema_version = await self._read_schema_version(dao)
         except Exception:
-            # Table doesn't exist, assume version 0
+            # Not cached, so a transient failure is retried next time
             return 0
+        return self._schema_version
+
+    @staticmethod
+    async def _read_schema_version(dao: DAO) -> int:
+        """Point lookup in schema_state, falling back to the schema_version
+        log for databases that predate it; no version table at all is 0."""
+        for query in (
+            "SELECT version FROM schema_state WHERE id = 1",
+            "SELECT MAX(version) FROM schema_version",
+        ):
+            try:
+                cursor = await dao.execute_query(query)
+            except sqlite3.OperationalError as e:
+                if "no such table" not in str(e):
+                    raise
+                continue
+            result = await cursor.fetchone()
+            if result and result[0] is not None:
+                return result[0]
+        return 0
 
     async def set_schema_version(self, version: int, migration_name: str) -> None:
         """Set schema version in database."""
-        async with DAO(self.db_path) as dao:
-            # Create schema_version table if it doesn't exist
-            await dao.execute_query("""
-                CREATE TABLE IF NOT EXISTS schema_version (
-                    version INTEGER NOT NULL,
-                    migration_name TEXT NOT NULL,
-                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        async with self._write_lock:
+            await self._set_schema_version(version, migration_name)
 
-            # Record this migration
-            await dao.execute_query(
-                "INSERT INTO schema_version (version, migration_name) VALUES (?, ?)",
-                (version, migration_name)
-            )
+    async def _set_schema_version(self, version: int, migration_name: str) -> None:
+        """Record a version; the caller holds the write lock."""
+        async with self._dao as dao:
+            await self._write_schema_version(dao, version, migration_name)
 
             # Commit the changes
             await dao.commit()
 
+        self._record_schema_version(version)
+
+    @staticmethod
+    async def _write_schema_version(dao: DAO, version: int, migration_name: str) -> None:
+        """Log a migration and bump the current version, without committing."""
+        # schema_version is the append-only log of applied migrations
+        await dao.execute_query("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER NOT NULL,
+                migration_name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # schema_state holds just the current version in its one row
+        await dao.execute_query("""
+            CREATE TABLE IF NOT EXISTS schema_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+        """)
+
+        # Record this migration
+        await dao.execute_query(
+            "INSERT INTO schema_version (version, migration_name) VALUES (?, ?)",
+            (version, migration_name)
+        )
+        # Like MAX(version) over the log, the current version never goes back
+        await dao.execute_query(
+            """
+            INSERT INTO schema_state (id, version) VALUES (1, ?)
+            ON CONFLICT(id) DO UPDATE SET version = max(version, excluded.version)
+            """,
+            (version,)
+        )
+
+    @staticmethod
+    async def _table_columns(dao: DAO, table: str) -> Set[str]:
+        """Names of the columns a table currently has."""
+        cursor = await dao.execute_query(f"PRAGMA table_info({table})")
+        return {row[1] for row in await cursor.fetchall()}
+
     async def needs_migration(self) -> bool:
         """Check if database needs migration."""
         current_version = await self.get_schema_version()
@@ -66,58 +255,72 @@ class MigrationManager:
 
     async def migrate(self, dry_run: bool = True) -> List[str]:
         """Run database migrations."""
-        current_version = await self.get_schema_version()
-        target_version = self.get_target_version()
+        if dry_run:
+            # Planning only reads the schema version; the steps each
+            # migration would take are fixed, so nothing else is queried
+            return self._plan_migrations(await self.get_schema_version())
+
+        async with self._write_lock, self._dao:
+            current_version = await self.get_schema_version()
+            target_version = self.get_target_version()
+
+            if current_version >= target_version:
+                return ["Database is already at the latest version"]
+
+            operations = []
+
+            # Run migrations from current_version + 1 to target_version
+            for version in range(current_version + 1, target_version + 1):
+                migration_ops = await self._apply_migration(version)
+                operations.extend(migration_ops)
+
+            return operations
 
+    def _plan_migrations(self, current_version: int) -> List[str]:
+        """Describe the migrations from current_version to the target."""
+        target_version = self.get_target_version()
         if current_version >= target_version:
             return ["Database is already at the latest version"]
 
         operations = []
-
-        # Run migrations from current_version + 1 to target_version
         for version in range(current_version + 1, target_version + 1):
-            migration_ops = await self._run_migration(version, dry_run)
-            operations.extend(migration_ops)
-
+            try:
+                operations.extend(MIGRATION_PLANS[version])
+            except KeyError:
+                raise ValueError(f"Unknown migration version: {version}") from None
         return operations
 
-    async def _run_migration(self, version: int, dry_run: bool) -> List[str]:
+    async def _apply_migration(self, version: int) -> List[str]:
         """Run a specific migration."""
         if version == 1:
-            return await self._migrate_to_v1(dry_run)
+            return await self._migrate_to_v1()
         elif version == 2:
-            return await self._migrate_to_v2(dry_run)
+            return await self._migrate_to_v2()
         else:
             raise ValueError(f"Unknown migration version: {version}")
 
-    async def _migrate_to_v1(self, dry_run: bool) -> List[str]:
+    async def _migrate_to_v1(self) -> List[str]:
         """Migrate to schema version 1 - add schema_version table."""
-        operations = ["Migration to v1: Add schema versioning"]
-
-        if not dry_run:
-            async with DAO(self.db_path) as dao:
-                await dao.execute_query("""
-                    CREATE TABLE IF NOT EXISTS schema_version (
-                        version INTEGER NOT NULL,
-                        migration_name TEXT NOT NULL,
-                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                await dao.commit()
-
-            await self.set_schema_version(1, "initial_versioning")
-            operations.append("+ Created schema_version table")
-        else:
-            operations.append("- Would create schema_version table")
+        async with self._dao as dao:
+            await dao.execute_query("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER NOT NULL,
+                    migration_name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            await dao.commit()
 
-        return operations
+        await self._set_schema_version(1, "initial_versioning")
+        return ["Migration to v1: Add schema versioning", "+ Created schema_version table"]
 
-    async def _migrate_to_v2(self, dry_run: bool) -> List[str]:
+    async def _migrate_to_v2(self) -> List[str]:
         """Migrate to schema version 2 - add FTS5 and performance improvements."""
-        operations = ["Migration to v2: Add FTS5 and performance indexes"]
-
-        if not dry_run:
-            async with DAO(self.db_path) as dao:
+        async with self._dao as dao:
+            # All of v2, including its schema_version row, is applied in
+            # one transaction: either it lands completely or not at all
+            await dao.execute_query("BEGIN IMMEDIATE")
+            try:
                 # Add FTS5 virtual tables
                 await dao.execute_query("""
                     CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts
@@ -137,146 +340,169 @@ class MigrationManager:
                     )
                 """)
 
-                # Create triggers to keep FTS in sync
-                await dao.execute_query("""
-                    CREATE TRIGGER IF NOT EXISTS scripts_ai AFTER INSERT ON scripts BEGIN
-                        INSERT INTO scripts_fts(rowid, id, name, doc, tags, inputs, outputs)
-                        VALUES (new.rowid, new.id, new.name, new.doc, new.tags, new.inputs, new.outputs);
-                    END
-                """)
-
-                await dao.execute_query("""
-                    CREATE TRIGGER IF NOT EXISTS scripts_ad AFTER DELETE ON scripts BEGIN
-                        INSERT INTO scripts_fts(scripts_fts, rowid, id, name, doc, tags, inputs, outputs)
-                        VALUES ('delete', old.rowid, old.id, old.name, old.doc, old.tags, old.inputs, old.outputs);
-                    END
-                """)
-
-                await dao.execute_query("""
-                    CREATE TRIGGER IF NOT EXISTS scripts_au AFTER UPDATE ON scripts BEGIN
-                        INSERT INTO scripts_fts(scripts_fts, rowid, id, name, doc, tags, inputs, outputs)
-                        VALUES ('delete', old.rowid, old.id, old.name, old.doc, old.tags, old.inputs, old.outputs);
-                        INSERT INTO scripts_fts(rowid, id, name, doc, tags, inputs, outputs)
-                        VALUES (new.rowid, new.id, new.name, new.doc, new.tags, new.inputs, new.outputs);
-                    END
-                """)
-
-                await dao.execute_query("""
-                    CREATE TRIGGER IF NOT EXISTS workflows_ai AFTER INSERT ON workflows BEGIN
-                        INSERT INTO workflows_fts(rowid, id, name, description, tags, steps)
-                        VALUES (new.rowid, new.id, new.name, new.description, new.tags, new.steps);
-                    END
-                """)
-
-                await dao.execute_query("""
-                    CREATE TRIGGER IF NOT EXISTS workflows_ad AFTER DELETE ON workflows BEGIN
-                        INSERT INTO workflows_fts(workflows_fts, rowid, id, name, description, tags, steps)
-                        VALUES ('delete', old.rowid, old.id, old.name, old.description, old.tags, old.steps);
-                    END
-                """)
-
-                await dao.execute_query("""
-                    CREATE TRIGGER IF NOT EXISTS workflows_au AFTER UPDATE ON workflows BEGIN
-                        INSERT INTO workflows_fts(workflows_fts, rowid, id, name, description, tags, steps)
-                        VALUES ('delete', old.rowid, old.id, old.name, old.description, old.tags, old.steps);
-                        INSERT INTO workflows_fts(rowid, id, name, description, tags, steps)
-                        VALUES (new.rowid, new.id, new.name, new.description, new.tags, new.steps);
-                    END
-                """)
-
-                # Populate FTS tables with existing data (handle missing columns gracefully)
-                try:
-                    await dao.execute_query("""
-                        INSERT OR IGNORE INTO scripts_fts(rowid, id, name, doc, tags, inputs, outputs)
-                        SELECT rowid, id, name,
-                               COALESCE(doc, '') as doc,
-                               COALESCE(tags, '[]') as tags,
-                               COALESCE(inputs, '[]') as inputs,
-                               COALESCE(outputs, '[]') as outputs
-                        FROM scripts
-                    """)
-                except Exception:
-                    # Fallback for minimal schema
-                    await dao.execute_query("""
-                        INSERT OR IGNORE INTO scripts_fts(rowid, id, name, doc, tags, inputs, outputs)
-                        SELECT rowid, id, name, '', '[]', '[]', '[]' FROM scripts
+                # Populate FTS tables with existing data before the sync
+                # triggers exist, so the bulk load is not doubled by them
+                table_columns = {}
+                for table, defaults in FTS_COLUMN_DEFAULTS.items():
+                    columns = table_columns[table] = await self._table_columns(dao, table)
+                    if all(column in columns for column, _ in defaults):
+                        # FTS5 builds the whole index from the content
+                        # table in one pass
+                        await dao.execute_query(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+                        continue
+                    # 'rebuild' would read the columns an older schema
+                    # lacks, so insert with those indexed as empty
+                    names = ", ".join(column for column, _ in defaults)
+                    values = ", ".join(_column_or_default(columns, column, default) for column, default in defaults)
+                    await dao.execute_query(f"""
+                        INSERT INTO {table}_fts(rowid, id, name, {names})
+                        SELECT rowid, id, name, {values} FROM {table}
                     """)
 
-                try:
-                    await dao.execute_query("""
-                        INSERT OR IGNORE INTO workflows_fts(rowid, id, name, description, tags, steps)
-                        SELECT rowid, id, name,
-                               COALESCE(description, '') as description,
-                               COALESCE(tags, '[]') as tags,
-                               COALESCE(steps, '[]') as steps
-                        FROM workflows
-                    """)
-                except Exception:
-                    # Fallback for minimal schema
-                    await dao.execute_query("""
-                        INSERT OR IGNORE INTO workflows_fts(rowid, id, name, description, tags, steps)
-                        SELECT rowid, id, name, '', '[]', '[]' FROM workflows
-                    """)
-
-                # Add performance indexes (handle missing columns gracefully)
-                try:
-                    await dao.execute_query("CREATE INDEX IF NOT EXISTS idx_scripts_created_at ON scripts(created_at)")
-                except Exception:
-                    pass  # Column doesn't exist
-
-                try:
-                    await dao.execute_query("CREATE INDEX IF NOT EXISTS idx_scripts_updated_at ON scripts(updated_at)")
-                except Exception:
-                    pass  # Column doesn't exist
-
-                try:
-                    await dao.execute_query("CREATE INDEX IF NOT EXISTS idx_workflows_created_at ON workflows(created_at)")
-                except Exception:
-                    pass  # Column doesn't exist
-
-                try:
-                    await dao.execute_query("CREATE INDEX IF NOT EXISTS idx_workflows_updated_at ON workflows(updated_at)")
-                except Exception:
-                    pass  # Column doesn't exist
-
-                # Commit all changes
+                # Create triggers to keep FTS in sync; the same definitions
+                # DAO.initialize() uses, minus the CREATE VIRTUAL TABLE
+                for statements in FTS_SCHEMA.values():
+                    for statement in statements[1:]:
+                        await dao.execute_query(statement)
+
+                # Add performance indexes on the timestamp columns that exist
+                for table, columns in table_columns.items():
+                    for column in ("created_at", "updated_at"):
+                        if column in columns:
+                            await dao.execute_query(
+                                f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})"
+                            )
+                    # Gather statistics for the new indexes now, so the
+                    # first queries after migrating are planned with them
+                    await dao.execute_query(f"ANALYZE {table}")
+
+                await self._write_schema_version(dao, 2, "fts5_and_performance")
                 await dao.commit()
-
-                # Update schema version within the same transaction context
-                await dao.execute_query(
-                    "INSERT INTO schema_version (version, migration_name) VALUES (?, ?)",
-                    (2, "fts5_and_performance")
-                )
-                await dao.commit()
-            operations.extend([
-                "+ Created FTS5 virtual tables",
-                "+ Created FTS sync triggers",
-                "+ Populated FTS with existing data",
-                "+ Added performance indexes"
-            ])
-        else:
-            operations.extend([
-                "- Would create FTS5 virtual tables",
-                "- Would create FTS sync triggers",
-                "- Would populate FTS with existing data",
-                "- Would add performance indexes"
-            ])
-
-        return operations
+            except Exception:
+                await dao.rollback()
+                raise
+            self._record_schema_version(2)
+        return [
+            "Migration to v2: Add FTS5 and performance indexes",
+            "+ Created FTS5 virtual tables",
+            "+ Created FTS sync triggers",
+            "+ Populated FTS with existing data",
+            "+ Added performance indexes",
+            "+ Refreshed query planner statistics",
+        ]
 
     async def normalize_data(self, dry_run: bool = True) -> List[str]:
         """Normalize and canonicalize existing data."""
         operations = ["Data normalization and canonicalization:"]
 
-        async with DAO(self.db_path) as dao:
-            # Get all scripts for normalization
-            cursor = await dao.execute_query("SELECT id, tags, inputs, outputs FROM scripts")
-            scripts = await cursor.fetchall()
+        # (json, id) parameter rows per column, flushed with one executemany each
+        script_updates: Dict[str, List[Tuple[str, str]]] = {"tags": [], "inputs": [], "outputs": []}
+        workflow_tag_updates: List[Tuple[str, str]] = []
+
+        async with self._write_lock, self._dao as dao:
+            if not dry_run:
+                # Take SQLite's write lock before reading so the rows
+                # normalized are the rows written back
+                await dao.execute_query("BEGIN IMMEDIATE")
+
+            try:
+                # Tags SQLite can normalize are rewritten in one UPDATE per table
+                for table, kind in (("scripts", "script"), ("workflows", "workflow")):
+                    cte = _normalized_tags_cte(table)
+                    cursor = await dao.execute_query(
+                        f"{cte} SELECT id FROM normalized WHERE new_tags <> old_tags"
+                    )
+                    changed = [row[0] for row in await cursor.fetchall()]
+                    operations.extend(
+                        f"- normalize tags for {kind} {row_id}" if dry_run else f"+ normalize tags for {kind} {row_id}"
+                        for row_id in changed
+                    )
+                    if changed and not dry_run:
+                        await dao.execute_query(f"""
+                            {cte}
+                            UPDATE {table} SET tags = normalized.new_tags
+                            FROM normalized
+                            WHERE normalized.id = {table}.id AND normalized.new_tags <> normalized.old_tags
+                        """)
+
+                # Item types SQLite can normalize are rewritten in one
+                # UPDATE per column, without fetching the arrays
+                for field_name in ("inputs", "outputs"):
+                    cte = _normalized_items_cte(field_name)
+                    cursor = await dao.execute_query(f"{cte} SELECT id FROM normalized")
+                    changed = [row[0] for row in await cursor.fetchall()]
+                    operations.extend(
+                        f"- normalize {field_name} for script {row_id}" if dry_run
+                        else f"+ normalize {field_name} for script {row_id}"
+                        for row_id in changed
+                    )
+                    if changed and not dry_run:
+                        await dao.execute_query(f"""
+                            {cte}
+                            UPDATE scripts SET {field_name} = normalized.new_value
+                            FROM normalized
+                            WHERE normalized.id = scripts.id
+                        """)
+
+                # The two scans are independent, so while one waits on a
+                # fetch the other decodes; both read through the same
+                # connection, inside the transaction opened above
+                script_ops, workflow_ops = await asyncio.gather(
+                    self._scan_scripts(dao, dry_run, script_updates),
+                    self._scan_workflows(dao, dry_run, workflow_tag_updates),
+                )
+                operations.extend(script_ops)
+                operations.extend(workflow_ops)
+
+                if not dry_run:
+                    # One statement per column for the whole batch, all in the
+                    # transaction opened above
+                    for field_name, rows in script_updates.items():
+                        if rows:
+                            await dao.execute_many(SCRIPT_COLUMN_UPDATES[field_name], rows)
+                    if workflow_tag_updates:
+                        await dao.execute_many(WORKFLOW_TAGS_UPDATE, workflow_tag_updates)
+
+                    # Commit all normalization changes
+                    await dao.commit()
+            except Exception:
+                if not dry_run:
+                    await dao.rollback()
+                raise
 
-            # Get all workflows for normalization
-            cursor = await dao.execute_query("SELECT id, tags, steps FROM workflows")
-            workflows = await cursor.fetchall()
+        if len(operations) == 1:
+            operations.append("- No data normalization needed" if dry_run else "+ All data already normalized")
 
+        return operations
+
+    @staticmethod
+    async def _scan_scripts(dao: DAO, dry_run: bool, updates: Dict[str, List[Tuple[str, str]]]) -> List[str]:
+        """Python-path normalization of the script columns SQL could not handle.
+
+        Appends (json, id) rows to ``updates`` per column and returns the
+        operations found.
+        """
+        operations = []
+
+        # Get only the scripts with something left for Python to
+        # check: columns SQL could not handle. Columns already
+        # handled in SQL come back as NULL so the loop below skips them.
+        inputs_in_sql = _sql_normalizable_items("inputs")
+        outputs_in_sql = _sql_normalizable_items("outputs")
+        cursor = await dao.execute_query(f"""
+            SELECT id,
+                   CASE WHEN {SQL_NORMALIZABLE_TAGS} THEN NULL ELSE tags END,
+                   CASE WHEN {inputs_in_sql} THEN NULL ELSE inputs END,
+                   CASE WHEN {outputs_in_sql} THEN NULL ELSE outputs END
+            FROM scripts
+            WHERE (tags <> '' AND NOT ({SQL_NORMALIZABLE_TAGS}))
+               OR (inputs NOT IN ('', '[]') AND NOT ({inputs_in_sql}))
+               OR (outputs NOT IN ('', '[]') AND NOT ({outputs_in_sql}))
+        """)
+        # Rows are streamed a chunk at a time so memory stays flat;
+        # updates are collected and written once the scan is done,
+        # since writing to a table mid-scan can disturb the scan
+        while scripts := await cursor.fetchmany(FETCH_CHUNK_SIZE):
             for script in scripts:
                 script_id, tags, inputs, outputs = script
                 normalized_ops = []
@@ -284,132 +510,113 @@ class MigrationManager:
                 # Normalize tags
                 if tags:
                     try:
-                        tag_list = json.loads(tags) if isinstance(tags, str) else tags
+                        tag_list = orjson.loads(tags) if isinstance(tags, str) else tags
                         if isinstance(tag_list, list):
                             normalized_tags = sorted(set(tag.strip().lower() for tag in tag_list if tag.strip()))
                             if normalized_tags != tag_list:
                                 normalized_ops.append(f"normalize tags for script {script_id}")
-                                if not dry_run:
-                                    await dao.execute_query(
-                                        "UPDATE scripts SET tags = ? WHERE id = ?",
-                                        (json.dumps(normalized_tags), script_id)
-                                    )
-                    except (json.JSONDecodeError, TypeError):
+                                updates["tags"].append((orjson.dumps(normalized_tags).decode(), script_id))
+                    except (orjson.JSONDecodeError, TypeError):
                         pass
 
                 # Normalize inputs/outputs
                 for field_name, field_value in [("inputs", inputs), ("outputs", outputs)]:
                     if field_value:
                         try:
-                            data = json.loads(field_value) if isinstance(field_value, str) else field_value
+                            data = orjson.loads(field_value) if isinstance(field_value, str) else field_value
                             if isinstance(data, list):
                                 normalized_data = []
                                 for item in data:
-                                    if isinstance(item, dict):
-                                        # Normalize file extensions
-                                        if 'type' in item:
-                                            item['type'] = item['type'].lower().strip('.')
-                                        # Sort keys for consistency
-                                        normalized_item = {k: v for k, v in sorted(item.items())}
-                                        normalized_data.append(normalized_item)
-                                    else:
-                                        normalized_data.append(item)
+                                    # Normalize file extensions; items are copied so
+                                    # the comparison below sees the change
+                                    if isinstance(item, dict) and 'type' in item:
+                                        item = {**item, 'type': item['type'].lower().strip('.')}
+                                    normalized_data.append(item)
 
                                 if normalized_data != data:
                                     normalized_ops.append(f"normalize {field_name} for script {script_id}")
-                                    if not dry_run:
-                                        await dao.execute_query(
-                                            f"UPDATE scripts SET {field_name} = ? WHERE id = ?",
-                                            (json.dumps(normalized_data), script_id)
-                                        )
-                        except (json.JSONDecodeError, TypeError):
+                                    # Keys are sorted for consistency when serialized
+                                    serialized = orjson.dumps(normalized_data, option=orjson.OPT_SORT_KEYS).decode()
+                                    updates[field_name].append((serialized, script_id))
+                        except (orjson.JSONDecodeError, TypeError):
                             pass
 
                 if normalized_ops:
                     operations.extend([f"- {op}" if dry_run else f"+ {op}" for op in normalized_ops])
 
-            # Normalize workflows
+        return operations
+
+    @staticmethod
+    async def _scan_workflows(dao: DAO, dry_run: bool, updates: List[Tuple[str, str]]) -> List[str]:
+        """Python-path normalization of workflow tags SQL could not handle."""
+        operations = []
+
+        # Get the workflows whose tags still need the Python path
+        cursor = await dao.execute_query(
+            f"SELECT id, tags FROM workflows WHERE tags <> '' AND NOT ({SQL_NORMALIZABLE_TAGS})"
+        )
+        while workflows := await cursor.fetchmany(FETCH_CHUNK_SIZE):
             for workflow in workflows:
-                workflow_id, tags, steps = workflow
+                workflow_id, tags = workflow
                 normalized_ops = []
 
                 # Normalize workflow tags
                 if tags:
                     try:
-                        tag_list = json.loads(tags) if isinstance(tags, str) else tags
+                        tag_list = orjson.loads(tags) if isinstance(tags, str) else tags
                         if isinstance(tag_list, list):
                             normalized_tags = sorted(set(tag.strip().lower() for tag in tag_list if tag.strip()))
                             if normalized_tags != tag_list:
                                 normalized_ops.append(f"normalize tags for workflow {workflow_id}")
-                                if not dry_run:
-                                    await dao.execute_query(
-                                        "UPDATE workflows SET tags = ? WHERE id = ?",
-                                        (json.dumps(normalized_tags), workflow_id)
-                                    )
-                    except (json.JSONDecodeError, TypeError):
+                                updates.append((orjson.dumps(normalized_tags).decode(), workflow_id))
+                    except (orjson.JSONDecodeError, TypeError):
                         pass
 
                 if normalized_ops:
                     operations.extend([f"- {op}" if dry_run else f"+ {op}" for op in normalized_ops])
 
-            # Commit all normalization changes
-            if not dry_run and len(operations) > 1:
-                await dao.commit()
-
-        if len(operations) == 1:
-            operations.append("- No data normalization needed" if dry_run else "+ All data already normalized")
-
         return operations
 
     async def check_integrity(self) -> List[str]:
         """Check database integrity."""
         issues = []
 
-        async with DAO(self.db_path) as dao:
-            # Check for orphaned data
+        # A separate read-only connection: the checks can run while a write
+        # is in progress and cannot modify anything
+        async with DAO(self.db_path, read_only=True) as dao:
+            # Validate every JSON column of a table in a single pass
             cursor = await dao.execute_query("""
-                SELECT COUNT(*) FROM scripts
-                WHERE inputs IS NOT NULL AND inputs != '' AND inputs != '[]'
-                AND json_valid(inputs) = 0
+                SELECT
+                    COUNT(CASE WHEN inputs NOT IN ('', '[]') AND json_valid(inputs) = 0 THEN 1 END),
+                    COUNT(CASE WHEN outputs NOT IN ('', '[]') AND json_valid(outputs) = 0 THEN 1 END)
+                FROM scripts
             """)
-            invalid_inputs = (await cursor.fetchone())[0]
+            invalid_inputs, invalid_outputs = await cursor.fetchone()
             if invalid_inputs > 0:
                 issues.append(f"Found {invalid_inputs} scripts with invalid JSON inputs")
-
-            cursor = await dao.execute_query("""
-                SELECT COUNT(*) FROM scripts
-                WHERE outputs IS NOT NULL AND outputs != '' AND outputs != '[]'
-                AND json_valid(outputs) = 0
-            """)
-            invalid_outputs = (await cursor.fetchone())[0]
             if invalid_outputs > 0:
                 issues.append(f"Found {invalid_outputs} scripts with invalid JSON outputs")
 
             cursor = await dao.execute_query("""
                 SELECT COUNT(*) FROM workflows
-                WHERE steps IS NOT NULL AND steps != '' AND steps != '[]'
-                AND json_valid(steps) = 0
+                WHERE steps NOT IN ('', '[]') AND json_valid(steps) = 0
             """)
             invalid_steps = (await cursor.fetchone())[0]
             if invalid_steps > 0:
                 issues.append(f"Found {invalid_steps} workflows with invalid JSON steps")
 
-            # Check for duplicates
+            # Check for duplicates; only the number of duplicated names is
+            # reported, so count them in SQL rather than fetching them
             cursor = await dao.execute_query("""
-                SELECT name, COUNT(*) as count FROM scripts
-                GROUP BY name HAVING count > 1
+                SELECT
+                    (SELECT COUNT(*) FROM (SELECT 1 FROM scripts GROUP BY name HAVING COUNT(*) > 1)),
+                    (SELECT COUNT(*) FROM (SELECT 1 FROM workflows GROUP BY name HAVING COUNT(*) > 1))
             """)
-            duplicate_scripts = await cursor.fetchall()
+            duplicate_scripts, duplicate_workflows = await cursor.fetchone()
             if duplicate_scripts:
-                issues.append(f"Found {len(duplicate_scripts)} duplicate script names")
-
-            cursor = await dao.execute_query("""
-                SELECT name, COUNT(*) as count FROM workflows
-                GROUP BY name HAVING count > 1
-            """)
-            duplicate_workflows = await cursor.fetchall()
+                issues.append(f"Found {duplicate_scripts} duplicate script names")
             if duplicate_workflows:
-                issues.append(f"Found {len(duplicate_workflows)} duplicate workflow names")
+                issues.append(f"Found {duplicate_workflows} duplicate workflow names")
 
             # SQLite integrity check
             cursor = await dao.execute_query("PRAGMA integrity_check")
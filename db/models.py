@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 
 class ScriptInput(BaseModel):
@@ -21,7 +22,27 @@ class ScriptOutput(BaseModel):
     format: Optional[str] = None
 
 
-class Script(BaseModel):
+class TaggedModel(BaseModel):
+    """Base for models with a tags list stored as a JSON column"""
+    tags: List[str] = Field(default_factory=list)
+
+    # (tags snapshot, serialized JSON). Keyed on the snapshot rather than
+    # invalidated by a setter so in-place edits like tags.append() are seen.
+    _tags_json: Optional[Tuple[Tuple[str, ...], str]] = PrivateAttr(default=None)
+
+    def tags_json(self) -> str:
+        """Return the tags as JSON text, reusing the last serialization"""
+        key = tuple(self.tags)
+        if self._tags_json is None or self._tags_json[0] != key:
+            self._tags_json = (key, orjson.dumps(self.tags).decode())
+        return self._tags_json[1]
+
+    def cache_tags_json(self, value: str) -> None:
+        """Record JSON text known to encode the current tags (e.g. as loaded)"""
+        self._tags_json = (tuple(self.tags), value)
+
+
+class Script(TaggedModel):
     """CEA script model"""
     id: Optional[str] = None
     name: str
@@ -34,8 +55,7 @@ class Script(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WorkflowStep(BaseModel):
@@ -49,7 +69,7 @@ class WorkflowStep(BaseModel):
     parameters: Dict[str, Any] = Field(default_factory=dict)
 
 
-class Workflow(BaseModel):
+class Workflow(TaggedModel):
     """CEA workflow model"""
     id: Optional[str] = None
     name: str
@@ -59,8 +79,7 @@ class Workflow(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ScriptSearchCriteria(BaseModel):
@@ -2,13 +2,17 @@
 MCP CEA Runner Server
 
 This module provides MCP-compatible interfaces for CEA script discovery and execution.
-Currently implemented as stubs that delegate to the existing DAO-based system.
+Script metadata comes from the existing DAO-based system; scripts are run as
+local subprocesses.
 
 In the future, this will be a proper MCP server that can be called remotely.
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import os
+import time
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 
 from loguru import logger
@@ -16,6 +20,18 @@ from loguru import logger
 from db import DAO
 from db.models import Script
 
+# Seconds a list_scripts result is served from cache before the DAO is
+# queried again; invalidate_cache() drops cached results immediately
+LIST_CACHE_TTL = 30.0
+
+# Script lookups arriving within this many seconds of each other are
+# resolved together, at most SCRIPT_BATCH_MAX ids per DAO query
+SCRIPT_BATCH_WINDOW = 0.005
+SCRIPT_BATCH_MAX = 64
+
+# Scripts run_script may have running at once; CEA_MAX_PARALLEL overrides it
+DEFAULT_MAX_PARALLEL_RUNS = 4
+
 
 class CEARunnerServer:
     """
@@ -36,14 +52,144 @@ class CEARunnerServer:
             dao: Database access object. If None, will create a new instance.
         """
         self.dao = dao or DAO()
+        self._owns_dao = dao is None
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        self._run_semaphore = asyncio.Semaphore(
+            int(os.getenv("CEA_MAX_PARALLEL", DEFAULT_MAX_PARALLEL_RUNS))
+        )
+        # list_scripts results keyed by normalized filters, with the
+        # monotonic time they were built; one lock per key so concurrent
+        # misses for the same filters share a single DAO query
+        self._list_cache: Dict[Tuple[Optional[str], FrozenSet[str]], Tuple[float, List[Dict[str, Any]]]] = {}
+        self._list_locks: Dict[Tuple[Optional[str], FrozenSet[str]], asyncio.Lock] = {}
+        # Scripts by id and the names of their required inputs; both only
+        # change when the catalog is refreshed
+        self._script_cache: Dict[str, Script] = {}
+        self._required_inputs: Dict[str, Tuple[str, ...]] = {}
+        # Per script: the argv prefix that launches it and the "--name"
+        # flag for each declared input
+        self._command_templates: Dict[str, Tuple[Tuple[str, ...], Dict[str, str]]] = {}
+        # Uncached lookups waiting for the next batch, and the task that
+        # resolves them; the task only exists while lookups are pending
+        self._pending_ids: Dict[str, List[asyncio.Future]] = {}
+        self._batch_task: Optional[asyncio.Task] = None
+        # list_scripts entries by script id, built once and shared by every
+        # listing that includes the script
+        self._serialized: Dict[str, Dict[str, Any]] = {}
+        # script_help payloads by script id
+        self._help_cache: Dict[str, Dict[str, Any]] = {}
+        # Full catalog in DAO order with its load time, plus script ids by
+        # lowercased category and by tag; reloaded after LIST_CACHE_TTL
+        self._catalog: Dict[str, Script] = {}
+        self._catalog_position: Dict[str, int] = {}
+        self._catalog_loaded_at: Optional[float] = None
+        self._catalog_lock = asyncio.Lock()
+        self._by_category: Dict[str, Set[str]] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+
+    def invalidate_cache(self) -> None:
+        """Drop cached scripts and listings, e.g. after the catalog was refreshed."""
+        self._list_cache.clear()
+        self._script_cache.clear()
+        self._required_inputs.clear()
+        self._command_templates.clear()
+        self._serialized.clear()
+        self._help_cache.clear()
+        self._catalog_loaded_at = None
+
+    async def _load_catalog(self) -> None:
+        """Load all scripts and rebuild the category and tag indexes if stale."""
+        async with self._catalog_lock:
+            if (self._catalog_loaded_at is not None
+                    and time.monotonic() - self._catalog_loaded_at < LIST_CACHE_TTL):
+                return
+
+            scripts = await self.dao.search_scripts()
+            self._catalog = {script.id: script for script in scripts}
+            self._catalog_position = {script_id: i for i, script_id in enumerate(self._catalog)}
+            self._by_category = {}
+            self._by_tag = {}
+            for script in scripts:
+                self._by_category.setdefault((script.category or "").lower(), set()).add(script.id)
+                for tag in script.tags or ():
+                    self._by_tag.setdefault(tag, set()).add(script.id)
+            self._catalog_loaded_at = time.monotonic()
+
+    async def _get_script_cached(self, script_id: str) -> Optional[Script]:
+        """Return the script with this id, querying the DAO only on first use.
+
+        Concurrent misses are coalesced into batched DAO queries.
+        """
+        script = self._script_cache.get(script_id)
+        if script is not None:
+            return script
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_ids.setdefault(script_id, []).append(future)
+        if self._batch_task is None:
+            self._batch_task = asyncio.create_task(self._resolve_pending_scripts())
+        return await future
+
+    async def _resolve_pending_scripts(self) -> None:
+        """Answer pending lookups with one get_scripts_by_ids query per batch."""
+        try:
+            await asyncio.sleep(SCRIPT_BATCH_WINDOW)
+            while self._pending_ids:
+                batch = {script_id: self._pending_ids.pop(script_id)
+                         for script_id in list(islice(self._pending_ids, SCRIPT_BATCH_MAX))}
+                try:
+                    scripts = await self.dao.get_scripts_by_ids(list(batch))
+                except Exception as e:
+                    for futures in batch.values():
+                        for future in futures:
+                            if not future.done():
+                                future.set_exception(e)
+                    continue
+
+                # Unknown ids are not cached so a later catalog load can add them
+                self._script_cache.update(scripts)
+                for script_id, futures in batch.items():
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(scripts.get(script_id))
+        finally:
+            self._batch_task = None
+
+    def _get_required_inputs(self, script: Script) -> Tuple[str, ...]:
+        """Names of the script's required inputs, computed once per script."""
+        required = self._required_inputs.get(script.id)
+        if required is None:
+            required = tuple(inp.name for inp in script.inputs or () if inp.required)
+            self._required_inputs[script.id] = required
+        return required
+
+    def _get_command_template(self, script: Script) -> Tuple[Tuple[str, ...], Dict[str, str]]:
+        """Argv prefix and input flags for a script, computed once per script."""
+        template = self._command_templates.get(script.id)
+        if template is None:
+            if script.file_path:
+                # Absolute, since the script runs from its own directory
+                prefix: Tuple[str, ...] = ("python", str(Path(script.file_path).resolve()))
+            elif script.command:
+                prefix = tuple(script.command.split())
+            else:
+                raise ValueError(f"Script {script.id} has no executable command or file path")
+            flags = {inp.name: f"--{inp.name}" for inp in script.inputs or ()}
+            template = (prefix, flags)
+            self._command_templates[script.id] = template
+        return template
 
     async def initialize(self) -> None:
         """Initialize the server and underlying DAO."""
-        if not self._initialized:
-            await self.dao.initialize()
-            self._initialized = True
-            logger.info("CEA Runner Server initialized")
+        if self._initialized:
+            return
+        # Concurrent first calls initialize the DAO once
+        async with self._init_lock:
+            if not self._initialized:
+                await self.dao.initialize()
+                self._initialized = True
+                logger.info("CEA Runner Server initialized")
 
     async def list_scripts(self,
                           category: Optional[str] = None,
@@ -67,48 +213,149 @@ class CEARunnerServer:
         if not self._initialized:
             await self.initialize()
 
+        key = (category.lower() if category else None, frozenset(tag.lower() for tag in tags or ()))
+        cached = self._list_cache.get(key)
+        if cached and time.monotonic() - cached[0] < LIST_CACHE_TTL:
+            return list(cached[1])
+
+        lock = self._list_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have filled the entry while this one waited
+            cached = self._list_cache.get(key)
+            if cached and time.monotonic() - cached[0] < LIST_CACHE_TTL:
+                return list(cached[1])
+
+            result = await self._list_scripts_uncached(category, tags)
+            self._list_cache[key] = (time.monotonic(), result)
+            return list(result)
+
+    async def _list_scripts_uncached(self,
+                                     category: Optional[str],
+                                     tags: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """Query and serialize the scripts matching the filters."""
         try:
-            # Get all scripts from DAO
-            scripts = await self.dao.search_scripts(query="")
+            result = [script_dict async for script_dict in self.iter_scripts(category, tags)]
+
+            # Arguments are only formatted if a sink accepts the level
+            logger.debug("Listed {} scripts (category={}, tags={})", len(result), category, tags)
+            return result
+
+        except Exception as e:
+            logger.error("Error listing scripts: {}", e)
+            raise
+
+    async def iter_scripts(self,
+                           category: Optional[str] = None,
+                           tags: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the scripts list_scripts would return, one at a time.
+
+        Entries come in the same order and format as list_scripts, so a
+        transport can stream them without building the whole list.
+
+        Example:
+            async for script in server.iter_scripts(category="demand"):
+                ...
+        """
+        if not self._initialized:
+            await self.initialize()
+        await self._load_catalog()
 
-            # Filter by category if provided
+        # A later reload replaces the catalog; keep iterating this one
+        catalog = self._catalog
+        if not category and not tags:
+            scripts: Iterable[Script] = catalog.values()
+        else:
+            ids: Optional[Set[str]] = None
+
+            # Category filter is a substring match, so scan the distinct
+            # categories rather than the scripts
             if category:
-                scripts = [s for s in scripts if category.lower() in (s.category or "").lower()]
+                needle = category.lower()
+                ids = set().union(*(members for name, members in self._by_category.items()
+                                    if needle in name))
 
-            # Filter by tags if provided
+            # Tag filter keeps scripts carrying any of the lowercased tags
             if tags:
-                tag_set = set(tag.lower() for tag in tags)
-                scripts = [s for s in scripts if tag_set.intersection(set(s.tags or []))]
+                tagged = set().union(*(self._by_tag.get(tag.lower(), ()) for tag in tags))
+                ids = tagged if ids is None else ids & tagged
 
-            # Convert to MCP-compatible format
-            result = []
-            for script in scripts:
-                script_dict = {
-                    "id": script.id,
-                    "name": script.name,
-                    "description": script.doc or "No description available",
-                    "category": script.category,
-                    "tags": script.tags or [],
-                    "file_path": script.file_path,
-                    "inputs": [
-                        {
-                            "name": inp.name,
-                            "type": inp.type,
-                            "required": inp.required,
-                            "description": inp.description or ""
-                        }
-                        for inp in script.inputs
-                    ] if script.inputs else [],
-                    "outputs": script.outputs or []
+            # Keep the DAO order of the unfiltered listing
+            scripts = [catalog[script_id]
+                       for script_id in sorted(ids, key=self._catalog_position.__getitem__)]
+
+        for script in scripts:
+            yield self._serialize(script)
+
+    def _serialize(self, script: Script) -> Dict[str, Any]:
+        """Return the list_scripts entry for a script, building it on first use."""
+        script_dict = self._serialized.get(script.id)
+        if script_dict is None:
+            script_dict = {
+                "id": script.id,
+                "name": script.name,
+                "description": script.doc or "No description available",
+                "category": script.category,
+                "tags": script.tags or [],
+                "file_path": script.file_path,
+                "inputs": [
+                    {
+                        "name": inp.name,
+                        "type": inp.type,
+                        "required": inp.required,
+                        "description": inp.description or ""
+                    }
+                    for inp in script.inputs
+                ] if script.inputs else [],
+                "outputs": script.outputs or []
+            }
+            self._serialized[script.id] = script_dict
+        return script_dict
+
+    def _build_help(self, script: Script) -> Dict[str, Any]:
+        """Build the script_help payload for a script."""
+        # Build comprehensive help information
+        help_info = {
+            "id": script.id,
+            "name": script.name,
+            "description": script.doc or "No description available",
+            "category": script.category,
+            "tags": script.tags or [],
+            "file_path": script.file_path,
+            "command": script.command,
+            "inputs": [],
+            "outputs": script.outputs or [],
+            "examples": [],
+            "usage": f"python {script.file_path}" if script.file_path else "Usage information not available"
+        }
+
+        # Detailed input information
+        if script.inputs:
+            for inp in script.inputs:
+                input_info = {
+                    "name": inp.name,
+                    "type": inp.type,
+                    "required": inp.required,
+                    "description": inp.description or "No description",
+                    "default": inp.default,
+                    "example": f"--{inp.name} example_value" if inp.name else ""
                 }
-                result.append(script_dict)
+                help_info["inputs"].append(input_info)
 
-            logger.debug(f"Listed {len(result)} scripts (category={category}, tags={tags})")
-            return result
+        # Generate usage examples
+        if script.inputs:
+            required_args = [inp for inp in script.inputs if inp.required]
+            if required_args:
+                example_args = []
+                for inp in required_args[:3]:  # Show first 3 required args
+                    example_args.append(f"--{inp.name} example_{inp.name}")
 
-        except Exception as e:
-            logger.error(f"Error listing scripts: {e}")
-            raise
+                help_info["examples"].append({
+                    "description": "Basic usage with required arguments",
+                    "command": f"python {script.file_path} {' '.join(example_args)}"
+                })
+
+        return help_info
 
     async def script_help(self, script_id: str) -> Dict[str, Any]:
         """
@@ -129,57 +376,22 @@ class CEARunnerServer:
             await self.initialize()
 
         try:
-            script = await self.dao.get_script_by_id(script_id)
+            script = await self._get_script_cached(script_id)
 
             if not script:
                 raise ValueError(f"Script not found: {script_id}")
 
-            # Build comprehensive help information
-            help_info = {
-                "id": script.id,
-                "name": script.name,
-                "description": script.doc or "No description available",
-                "category": script.category,
-                "tags": script.tags or [],
-                "file_path": script.file_path,
-                "command": script.command,
-                "inputs": [],
-                "outputs": script.outputs or [],
-                "examples": [],
-                "usage": f"python {script.file_path}" if script.file_path else "Usage information not available"
-            }
+            help_info = self._help_cache.get(script_id)
+            if help_info is None:
+                help_info = self._build_help(script)
+                self._help_cache[script_id] = help_info
 
-            # Detailed input information
-            if script.inputs:
-                for inp in script.inputs:
-                    input_info = {
-                        "name": inp.name,
-                        "type": inp.type,
-                        "required": inp.required,
-                        "description": inp.description or "No description",
-                        "default": inp.default,
-                        "example": f"--{inp.name} example_value" if inp.name else ""
-                    }
-                    help_info["inputs"].append(input_info)
-
-            # Generate usage examples
-            if script.inputs:
-                required_args = [inp for inp in script.inputs if inp.required]
-                if required_args:
-                    example_args = []
-                    for inp in required_args[:3]:  # Show first 3 required args
-                        example_args.append(f"--{inp.name} example_{inp.name}")
-
-                    help_info["examples"].append({
-                        "description": "Basic usage with required arguments",
-                        "command": f"python {script.file_path} {' '.join(example_args)}"
-                    })
-
-            logger.debug(f"Retrieved help for script: {script_id}")
-            return help_info
+            logger.debug("Retrieved help for script: {}", script_id)
+            # Shallow copy so callers can add keys without touching the cache
+            return dict(help_info)
 
         except Exception as e:
-            logger.error(f"Error getting script help for {script_id}: {e}")
+            logger.error("Error getting script help for {}: {}", script_id, e)
             raise
 
     async def run_script(self,
@@ -216,31 +428,24 @@ class CEARunnerServer:
             await self.initialize()
 
         try:
-            script = await self.dao.get_script_by_id(script_id)
+            script = await self._get_script_cached(script_id)
 
             if not script:
                 raise ValueError(f"Script not found: {script_id}")
 
             # Validate required arguments
-            if script.inputs:
-                required_inputs = [inp.name for inp in script.inputs if inp.required]
-                missing_args = [arg for arg in required_inputs if arg not in args]
-
-                if missing_args:
-                    raise ValueError(f"Missing required arguments: {missing_args}")
+            missing_args = [arg for arg in self._get_required_inputs(script) if arg not in args]
+            if missing_args:
+                raise ValueError(f"Missing required arguments: {missing_args}")
 
             # Build command for execution
-            cmd_parts = []
-            if script.file_path:
-                cmd_parts.extend(["python", str(script.file_path)])
-            elif script.command:
-                cmd_parts.extend(script.command.split())
-            else:
-                raise ValueError(f"Script {script_id} has no executable command or file path")
+            prefix, flags = self._get_command_template(script)
+            cmd_parts = list(prefix)
 
             # Add arguments
             for arg_name, arg_value in args.items():
-                cmd_parts.extend([f"--{arg_name}", str(arg_value)])
+                cmd_parts.append(flags.get(arg_name) or f"--{arg_name}")
+                cmd_parts.append(str(arg_value))
 
             # Set default timeout
             if timeout is None:
@@ -250,28 +455,42 @@ class CEARunnerServer:
             if working_dir is None and script.file_path:
                 working_dir = str(Path(script.file_path).parent)
 
-            # Execute the script (stub implementation)
-            # In real MCP implementation, this would make an actual subprocess call
-            logger.info(f"Would execute: {' '.join(cmd_parts)} (timeout={timeout}s, cwd={working_dir})")
+            # Execute the script; runs beyond the parallel limit wait here
+            async with self._run_semaphore:
+                command = " ".join(cmd_parts)
+                logger.info("Executing: {} (timeout={}s, cwd={})", command, timeout, working_dir)
+                start_time = time.perf_counter()
+                process = await asyncio.create_subprocess_exec(
+                    *cmd_parts,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=working_dir
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    raise TimeoutError(f"Script {script_id} timed out after {timeout}s")
+                execution_time = time.perf_counter() - start_time
 
-            # Simulate execution result
             result = {
                 "script_id": script_id,
-                "command": " ".join(cmd_parts),
-                "exit_code": 0,  # Simulated success
-                "stdout": f"Simulated output from {script.name}",
-                "stderr": "",
-                "execution_time": 1.5,  # Simulated execution time
+                "command": command,
+                "exit_code": process.returncode,
+                "stdout": stdout.decode("utf-8", errors="replace"),
+                "stderr": stderr.decode("utf-8", errors="replace"),
+                "execution_time": execution_time,
                 "working_directory": working_dir,
                 "arguments": args,
-                "status": "completed"
+                "status": "completed" if process.returncode == 0 else "failed"
             }
 
-            logger.info(f"Script {script_id} executed successfully (simulated)")
+            logger.info("Script {} exited with code {} in {:.2f}s", script_id, process.returncode, execution_time)
             return result
 
         except Exception as e:
-            logger.error(f"Error executing script {script_id}: {e}")
+            logger.error("Error executing script {}: {}", script_id, e)
             # Return error result in MCP-compatible format
             return {
                 "script_id": script_id,
@@ -288,6 +507,12 @@ class CEARunnerServer:
 
     async def shutdown(self) -> None:
         """Clean shutdown of the server."""
+        # A DAO the server created is closed even if initialize() never ran
+        # or failed part-way; a caller-supplied DAO stays with its owner
+        if self._batch_task is not None:
+            await self._batch_task
+        if self._owns_dao:
+            await self.dao.close()
         if self._initialized:
             # In a real MCP server, this would close connections, cleanup resources
             logger.info("CEA Runner Server shutting down")
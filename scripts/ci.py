@@ -4,29 +4,61 @@ Local CI script for running all checks before committing
 Usage: python scripts/ci.py
 """
 
-import subprocess
+import asyncio
+import shlex
 import sys
 from pathlib import Path
+from typing import Optional
 
 
-def run_command(cmd: str, description: str) -> bool:
-    """Run a command and return True if successful"""
+def print_header(cmd: str, description: str) -> None:
+    """Print the banner shown before a check's output"""
     print(f"\n{'='*60}")
     print(f"Running: {description}")
     print(f"Command: {cmd}")
     print('='*60)
 
-    result = subprocess.run(cmd, shell=True, capture_output=False)
 
-    if result.returncode == 0:
+def print_result(description: str, success: bool) -> None:
+    """Print the pass/fail line shown after a check's output"""
+    if success:
         print(f"✅ {description} - PASSED")
-        return True
     else:
         print(f"❌ {description} - FAILED")
-        return False
 
 
-def main():
+async def run_command(cmd: str, description: str, capture: bool = False) -> bool:
+    """Run a command and return True if successful
+
+    With capture, the output is collected and printed in one block when the
+    command finishes so checks running concurrently do not interleave.
+    """
+    if not capture:
+        print_header(cmd, description)
+
+    output: Optional[bytes] = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *shlex.split(cmd),
+            stdout=asyncio.subprocess.PIPE if capture else None,
+            stderr=asyncio.subprocess.STDOUT if capture else None,
+        )
+        output, _ = await process.communicate()
+        success = process.returncode == 0
+    except FileNotFoundError as e:
+        output = f"{e}\n".encode()
+        success = False
+
+    if capture:
+        print_header(cmd, description)
+    if output:
+        sys.stdout.write(output.decode(errors="replace"))
+        sys.stdout.flush()
+    print_result(description, success)
+    return success
+
+
+async def main():
     """Run all CI checks"""
     project_root = Path(__file__).parent.parent
 
@@ -37,17 +69,20 @@ def main():
     print("🚀 Running local CI checks...")
     print(f"Project root: {project_root.absolute()}")
 
+    # Lint and type checks are independent and run side by side; the test
+    # suite runs on its own afterwards so it has every core to itself
     checks = [
         ("ruff check .", "Ruff linting"),
         ("ruff format --check .", "Ruff formatting"),
         ("mypy . --ignore-missing-imports", "MyPy type checking"),
-        ("pytest --cov=. --cov-report=term-missing --cov-fail-under=75", "Tests with coverage"),
     ]
+    test_check = ("pytest --cov=. --cov-report=term-missing --cov-fail-under=75", "Tests with coverage")
 
-    results = []
-    for cmd, description in checks:
-        success = run_command(cmd, description)
-        results.append((description, success))
+    outcomes = await asyncio.gather(
+        *(run_command(cmd, description, capture=True) for cmd, description in checks)
+    )
+    results = [(description, success) for (_, description), success in zip(checks, outcomes)]
+    results.append((test_check[1], await run_command(*test_check)))
 
     print(f"\n{'='*60}")
     print("CI RESULTS SUMMARY")
@@ -71,4 +106,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -9,7 +9,8 @@ Shows real-time message exchange between two agents with timing information.
 import asyncio
 import time
 import uuid
-from typing import List, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Tuple
 
 from rich.console import Console
 from rich.live import Live
@@ -30,18 +31,30 @@ from agents import PingerAgent, PongerAgent
 
 console = Console()
 
+# Messages kept for the history panel; older ones only count in the totals
+HISTORY_ROWS = 10
+
 
 class PingPongDemo:
     def __init__(self) -> None:
         self.router = Router()
         self.pinger = PingerAgent(self.router)
         self.ponger = PongerAgent(self.router)
-        self.message_history: List[Tuple[float, str, str, str]] = []
+        self.message_history: Deque[Tuple[float, str, str, str]] = deque(maxlen=HISTORY_ROWS)
         self.round_trip_times: List[float] = []
         self.running = False
 
-    def create_display(self) -> Layout:
-        """Create the rich display layout"""
+        # Running totals so a redraw does not rescan the history
+        self._message_count = 0
+        self._messages_by_sender: Dict[str, int] = {}
+        self._rtt_sum = 0.0
+        self._rtt_min = 0.0
+        self._rtt_max = 0.0
+
+        self._layout = self._create_layout()
+
+    def _create_layout(self) -> Layout:
+        """Create the layout and its static header once"""
         layout = Layout()
 
         layout.split_column(
@@ -66,57 +79,77 @@ class PingPongDemo:
             )
         )
 
-        # Agent status
+        return layout
+
+    def _record_message(self, elapsed: float, sender: str, msg_type: str, content: str) -> None:
+        """Append a message to the history and update the message counts"""
+        self.message_history.append((elapsed, sender, msg_type, content))
+        self._message_count += 1
+        self._messages_by_sender[sender] = self._messages_by_sender.get(sender, 0) + 1
+
+    def _record_round_trip(self, round_trip_ms: float) -> None:
+        """Append a round-trip time and update the running statistics"""
+        if not self.round_trip_times:
+            self._rtt_min = self._rtt_max = round_trip_ms
+        else:
+            self._rtt_min = min(self._rtt_min, round_trip_ms)
+            self._rtt_max = max(self._rtt_max, round_trip_ms)
+        self._rtt_sum += round_trip_ms
+        self.round_trip_times.append(round_trip_ms)
+
+    def _rebuild_agents_panel(self) -> None:
+        """Redraw the agent status panel"""
         agent_table = Table(title="Agent Status", show_header=True)
         agent_table.add_column("Agent", style="cyan")
         agent_table.add_column("Status", style="green")
         agent_table.add_column("Messages", style="yellow")
 
-        pinger_status = "Running" if self.running else "Stopped"
-        ponger_status = "Running" if self.running else "Stopped"
+        status = "Running" if self.running else "Stopped"
 
-        pinger_msgs = len([m for m in self.message_history if m[1] == "pinger"])
-        ponger_msgs = len([m for m in self.message_history if m[1] == "ponger"])
+        agent_table.add_row("Pinger", status, str(self._messages_by_sender.get("pinger", 0)))
+        agent_table.add_row("Ponger", status, str(self._messages_by_sender.get("ponger", 0)))
 
-        agent_table.add_row("Pinger", pinger_status, str(pinger_msgs))
-        agent_table.add_row("Ponger", ponger_status, str(ponger_msgs))
+        self._layout["agents"].update(Panel(agent_table, title="Agents"))
 
-        layout["agents"].update(Panel(agent_table, title="Agents"))
-
-        # Message history
+    def _rebuild_messages_panel(self) -> None:
+        """Redraw the message history panel"""
         msg_table = Table(title="Message History", show_header=True)
         msg_table.add_column("Time", style="dim")
         msg_table.add_column("From", style="cyan")
         msg_table.add_column("Type", style="magenta")
         msg_table.add_column("Content", style="white")
 
-        # Show last 10 messages
-        for timestamp, sender, msg_type, content in self.message_history[-10:]:
+        # Show the last HISTORY_ROWS messages
+        for timestamp, sender, msg_type, content in self.message_history:
             time_str = f"{timestamp:.3f}s"
             prefix = ">>>" if msg_type == "ping" else "<<<"
             msg_table.add_row(time_str, sender, f"{prefix} {msg_type}", content)
 
-        layout["messages"].update(Panel(msg_table, title="Messages"))
+        self._layout["messages"].update(Panel(msg_table, title="Messages"))
 
-        # Statistics
+    def _rebuild_stats_panel(self) -> None:
+        """Redraw the statistics panel"""
         stats_table = Table(show_header=False)
         stats_table.add_column("Metric", style="cyan")
         stats_table.add_column("Value", style="yellow")
 
-        total_msgs = len(self.message_history)
-        avg_time = sum(self.round_trip_times) / len(self.round_trip_times) if self.round_trip_times else 0
-        min_time = min(self.round_trip_times) if self.round_trip_times else 0
-        max_time = max(self.round_trip_times) if self.round_trip_times else 0
+        round_trips = len(self.round_trip_times)
+        avg_time = self._rtt_sum / round_trips if round_trips else 0
 
-        stats_table.add_row("Total Messages", str(total_msgs))
-        stats_table.add_row("Round Trips", str(len(self.round_trip_times)))
+        stats_table.add_row("Total Messages", str(self._message_count))
+        stats_table.add_row("Round Trips", str(round_trips))
         stats_table.add_row("Avg Round-Trip", f"{avg_time:.1f}ms")
-        stats_table.add_row("Min Round-Trip", f"{min_time:.1f}ms")
-        stats_table.add_row("Max Round-Trip", f"{max_time:.1f}ms")
+        stats_table.add_row("Min Round-Trip", f"{self._rtt_min:.1f}ms")
+        stats_table.add_row("Max Round-Trip", f"{self._rtt_max:.1f}ms")
 
-        layout["footer"].update(Panel(stats_table, title="Statistics"))
+        self._layout["footer"].update(Panel(stats_table, title="Statistics"))
 
-        return layout
+    def create_display(self) -> Layout:
+        """Refresh the dynamic panels and return the rich display layout"""
+        self._rebuild_agents_panel()
+        self._rebuild_messages_panel()
+        self._rebuild_stats_panel()
+        return self._layout
 
     async def run_demo(self, rounds: int = 5, delay: float = 1.0) -> None:
         """Run the ping/pong demo with visual display"""
@@ -130,7 +163,7 @@ class PingPongDemo:
         self.running = True
 
         try:
-            with Live(self.create_display(), refresh_per_second=10, screen=True) as live:
+            with Live(self.create_display(), refresh_per_second=4, screen=True) as live:
                 # Give agents time to start
                 await asyncio.sleep(0.1)
 
@@ -142,46 +175,47 @@ class PingPongDemo:
                     conversation_id = str(uuid.uuid4())[:8]  # Short ID for display
 
                     # Send ping
-                    start_time = time.time()
+                    start_time = time.perf_counter()
                     await self.pinger.send_ping(conversation_id)
 
                     # Record ping message
-                    self.message_history.append((
-                        time.time() - start_time,
+                    self._record_message(
+                        time.perf_counter() - start_time,
                         "pinger",
                         "ping",
                         f"Round {round_num + 1} (ID: {conversation_id})"
-                    ))
+                    )
+                    self._rebuild_agents_panel()
+                    self._rebuild_messages_panel()
+                    live.refresh()
 
-                    # Wait for pong response
-                    timeout = 1.0
-                    elapsed = 0
-                    while not self.pinger.response_received and elapsed < timeout:
-                        await asyncio.sleep(0.01)
-                        elapsed = time.time() - start_time
-                        live.update(self.create_display())
+                    # Wait for pong response; nothing on screen changes
+                    # until it arrives
+                    received = await self.pinger.wait_for_response(timeout=1.0)
+                    elapsed = time.perf_counter() - start_time
 
-                    if self.pinger.response_received:
+                    if received:
                         # Record pong message and round-trip time
                         round_trip_ms = elapsed * 1000
-                        self.round_trip_times.append(round_trip_ms)
+                        self._record_round_trip(round_trip_ms)
 
-                        self.message_history.append((
+                        self._record_message(
                             elapsed,
                             "ponger",
                             "pong",
                             f"Reply to Round {round_num + 1} ({round_trip_ms:.1f}ms)"
-                        ))
+                        )
                     else:
-                        self.message_history.append((
+                        self._record_message(
                             elapsed,
                             "system",
                             "timeout",
                             f"Round {round_num + 1} timed out"
-                        ))
+                        )
 
                     # Update display
-                    live.update(self.create_display())
+                    self.create_display()
+                    live.refresh()
 
                     # Wait before next round
                     if round_num < rounds - 1:
@@ -189,7 +223,8 @@ class PingPongDemo:
 
                 # Final display with complete stats
                 self.running = False
-                live.update(self.create_display())
+                self.create_display()
+                live.refresh()
 
                 # Show final summary
                 await asyncio.sleep(2)
@@ -220,9 +255,9 @@ class PingPongDemo:
         console.print("="*60, style="bright_blue")
 
         if self.round_trip_times:
-            avg_time = sum(self.round_trip_times) / len(self.round_trip_times)
-            min_time = min(self.round_trip_times)
-            max_time = max(self.round_trip_times)
+            avg_time = self._rtt_sum / len(self.round_trip_times)
+            min_time = self._rtt_min
+            max_time = self._rtt_max
 
             console.print(f"\nPerformance Metrics:")
             console.print(f"  * Total round trips: {len(self.round_trip_times)}")
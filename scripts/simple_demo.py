@@ -54,20 +54,17 @@ async def simple_ping_pong_demo(rounds: int = 3) -> None:
             print(f"  Conversation ID: {conversation_id}")
 
             # Send ping
-            start_time = time.time()
+            start_time = time.perf_counter()
             success = await pinger.send_ping(conversation_id)
 
             if success:
                 print(f"  >>> Ping sent")
 
                 # Wait for pong response
-                timeout = 1.0
-                elapsed = 0
-                while not pinger.response_received and elapsed < timeout:
-                    await asyncio.sleep(0.001)
-                    elapsed = time.time() - start_time
+                received = await pinger.wait_for_response(timeout=1.0)
+                elapsed = time.perf_counter() - start_time
 
-                if pinger.response_received:
+                if received:
                     round_trip_ms = elapsed * 1000
                     round_trip_times.append(round_trip_ms)
 
@@ -73,6 +73,7 @@ async def test_refresh_communication():
             await agent_task
         except asyncio.CancelledError:
             pass
+        await dao.close()
 
 
 if __name__ == "__main__":
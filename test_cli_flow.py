@@ -147,6 +147,7 @@ async def test_cli_refresh():
                 await task
             except asyncio.CancelledError:
                 pass
+        await assistant.dao.close()
 
 
 if __name__ == "__main__":
@@ -54,18 +54,18 @@ async def test_dao_upsert():
     """Test DAO upsert functionality"""
     print("\nTesting DAO upsert...")
 
-    dao = DAO("test_refresh.db")
-    await dao.initialize()
+    async with DAO("test_refresh.db") as dao:
+        await dao.initialize()
 
-    scripts = await test_script_discovery()
+        scripts = await test_script_discovery()
 
-    for script in scripts:
-        script_id = await dao.upsert_script(script)
-        print(f"Upserted script {script.name} with ID: {script_id}")
+        for script in scripts:
+            script_id = await dao.upsert_script(script)
+            print(f"Upserted script {script.name} with ID: {script_id}")
 
-    # Verify scripts in database
-    all_scripts = await dao.get_all_scripts()
-    print(f"\nDatabase now contains {len(all_scripts)} scripts")
+        # Verify scripts in database
+        all_scripts = await dao.get_all_scripts()
+        print(f"\nDatabase now contains {len(all_scripts)} scripts")
 
     return all_scripts
 
@@ -310,15 +310,45 @@ class TestCanonicalizationHelpers:
 
     def test_tag_normalization_rules(self):
         """Test tag normalization rules."""
-        # This would test individual helper functions if they were extracted
-        # For now, we test through the integration tests above
-        pass
+        from cli.maintain import canonicalize_tags
+
+        assert canonicalize_tags(["COOLING", "cooling", "Solar Radiation", "", 3]) == [
+            "cooling",
+            "solar_radiation",
+        ]
+        assert canonicalize_tags("cooling") == []
+
+    def test_snake_case_fast_path(self):
+        """Already-canonical values are returned as-is; others are split."""
+        from cli.maintain import to_snake_case
+
+        canonical = "weather_epw"
+        assert to_snake_case(canonical) is canonical
+        assert to_snake_case("demand2") == "demand2"
+        assert to_snake_case("Weather-EPW") == "weather_epw"
+        assert to_snake_case("trailing_") == "trailing"
+        assert to_snake_case("a__b") == "a_b"
 
     def test_io_data_normalization_rules(self):
         """Test I/O data normalization rules."""
-        # This would test individual helper functions if they were extracted
-        # For now, we test through the integration tests above
-        pass
+        from cli.maintain import canonicalize_io_data
+
+        data = {"Weather File": "a.epw", "zone": "zone.geojson", "Year": 2020, "path": Path("x")}
+        assert canonicalize_io_data(data) == {
+            "weather_epw": "a.epw",
+            "zone_geojson": "zone.geojson",
+            "year": 2020,
+            "path": "x",
+        }
+        assert canonicalize_io_data(["not", "a", "dict"]) == ["not", "a", "dict"]
+
+    def test_canonical_io_key(self):
+        """Test key snake_casing and synonym mapping."""
+        from cli.maintain import _canonical_io_key
+
+        assert _canonical_io_key("EPW") == "weather_epw"
+        assert _canonical_io_key("capex-opex") == "cost_params"
+        assert _canonical_io_key("Output Folder") == "output_folder"
 
 
 if __name__ == "__main__":
@@ -210,6 +210,175 @@ class TestMaintenanceCLI:
             assert "Backup created:" in result.stdout
 
 
+class TestVacuum:
+    """Test the vacuum shadow-file swap and its safety checks."""
+
+    def _add_free_pages(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE filler (data BLOB)")
+        conn.executemany("INSERT INTO filler VALUES (?)", [(b"x" * 4096,)] * 200)
+        conn.commit()
+        conn.execute("DELETE FROM filler")
+        conn.commit()
+        conn.close()
+
+    def test_swap_compacts_and_cleans_up(self, temp_db):
+        """The compacted copy replaces the database and side files are removed."""
+        self._add_free_pages(temp_db)
+        size_before = Path(temp_db).stat().st_size
+        runner = CliRunner()
+
+        result = runner.invoke(app, ["vacuum", "--db", temp_db])
+
+        assert result.exit_code == 0
+        assert "vacuuming in place" not in result.stdout
+        assert Path(temp_db).stat().st_size < size_before
+        assert not Path(temp_db).with_suffix(".vacuum.tmp").exists()
+        assert not Path(temp_db).with_suffix(".vacuum.lock").exists()
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT id FROM scripts").fetchall() == [("test-script",)]
+        conn.close()
+
+    def test_stale_lock_requires_force(self, temp_db):
+        """An existing lock file blocks the run until --force clears it."""
+        lock_path = Path(temp_db).with_suffix(".vacuum.lock")
+        lock_path.touch()
+        runner = CliRunner()
+
+        try:
+            result = runner.invoke(app, ["vacuum", "--db", temp_db])
+            assert result.exit_code == 1
+            assert "--force" in result.stdout
+
+            result = runner.invoke(app, ["vacuum", "--db", temp_db, "--force"])
+            assert result.exit_code == 0
+            assert not lock_path.exists()
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    def test_failed_swap_removes_shadow(self, temp_db):
+        """A failure after VACUUM INTO leaves the original database untouched."""
+        runner = CliRunner()
+
+        with patch("cli.maintain.os.replace", side_effect=OSError("disk full")):
+            result = runner.invoke(app, ["vacuum", "--db", temp_db])
+
+        assert result.exit_code == 1
+        assert not Path(temp_db).with_suffix(".vacuum.tmp").exists()
+        assert not Path(temp_db).with_suffix(".vacuum.lock").exists()
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        conn.close()
+
+    def test_open_connection_falls_back_to_in_place(self, temp_db):
+        """Writes from a connection open during vacuum are not lost."""
+        self._add_free_pages(temp_db)
+        other = sqlite3.connect(temp_db)
+        other.execute("PRAGMA journal_mode = WAL")
+        other.execute("SELECT COUNT(*) FROM scripts").fetchone()
+        runner = CliRunner()
+
+        try:
+            result = runner.invoke(app, ["vacuum", "--db", temp_db])
+            assert result.exit_code == 0
+            assert "vacuuming in place" in result.stdout
+
+            other.execute(
+                "INSERT INTO scripts (id, name, path) VALUES ('late', 'Late', '/late.py')"
+            )
+            other.commit()
+        finally:
+            other.close()
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        ids = {row[0] for row in conn.execute("SELECT id FROM scripts")}
+        conn.close()
+        assert ids == {"test-script", "late"}
+
+
+class TestUpdateStatistics:
+    """Test optimizer statistics refresh."""
+
+    def test_full_analyze_populates_stat1(self, temp_db):
+        """A full ANALYZE writes sqlite_stat1 rows."""
+        from cli.maintain import update_statistics
+
+        conn = sqlite3.connect(temp_db)
+        try:
+            conn.execute("CREATE INDEX idx_scripts_name ON scripts(name)")
+            update_statistics(conn, full=True)
+            rows = conn.execute("SELECT tbl FROM sqlite_stat1").fetchall()
+        finally:
+            conn.close()
+
+        assert ("scripts",) in rows
+
+    def test_default_uses_bounded_optimize(self):
+        """The default path sets analysis_limit before PRAGMA optimize."""
+        from unittest.mock import MagicMock
+
+        from cli.maintain import update_statistics
+
+        conn = MagicMock()
+        update_statistics(conn)
+
+        statements = [call.args[0] for call in conn.execute.call_args_list]
+        assert statements == ["PRAGMA analysis_limit = 1000", "PRAGMA optimize"]
+
+
+class TestReindexOptions:
+    """Test the reindex --quiet and --full options."""
+
+    @pytest.fixture(autouse=True)
+    def _isolate_backups(self, tmp_path, monkeypatch):
+        # The migration step writes its backup under ./backups
+        monkeypatch.chdir(tmp_path)
+
+    def test_full_runs_analyze(self, temp_db):
+        """--full is forwarded to update_statistics."""
+        runner = CliRunner()
+
+        with patch("cli.maintain.update_statistics") as mock_stats:
+            result = runner.invoke(app, ["reindex", "--db", temp_db, "--quiet", "--full"])
+
+        assert result.exit_code == 0
+        assert mock_stats.call_args.args[1] is True
+
+    def test_quiet_suppresses_progress(self, temp_db):
+        """--quiet drops progress lines and the timing table."""
+        runner = CliRunner()
+
+        result = runner.invoke(app, ["reindex", "--db", temp_db, "--quiet"])
+
+        assert result.exit_code == 0
+        assert "Rebuilding indexes" not in result.stdout
+        assert "Query Performance" not in result.stdout
+
+    def test_quiet_still_reports_errors(self, temp_db):
+        """Failures are printed even when --quiet is set."""
+        runner = CliRunner()
+
+        with patch("cli.maintain.update_statistics", side_effect=sqlite3.OperationalError("boom")):
+            result = runner.invoke(app, ["reindex", "--db", temp_db, "--quiet"])
+
+        assert result.exit_code == 1
+        assert "Reindex failed: boom" in result.stdout
+
+    def test_migration_exit_is_not_rewrapped(self, temp_db):
+        """A failed migration exits with its own message, not a reindex error."""
+        runner = CliRunner()
+
+        with patch("cli.maintain.MigrationManager.migrate", side_effect=RuntimeError("bad schema")):
+            result = runner.invoke(app, ["reindex", "--db", temp_db, "--quiet"])
+
+        assert result.exit_code == 1
+        assert "Migration failed: bad schema" in result.stdout
+        assert "Reindex failed" not in result.stdout
+
+
 class TestErrorHandling:
     """Test error handling in maintenance commands."""
 
@@ -166,6 +166,24 @@ class TestMigrationManager:
         version = await manager.get_schema_version()
         assert version == 0
 
+    @pytest.mark.asyncio
+    async def test_dry_run_only_reads_schema_version(self, pre_v2_db, monkeypatch):
+        """Planning a migration queries nothing but the schema version."""
+        from db.dao import DAO
+
+        queries = []
+        original = DAO.execute_query
+
+        async def recording(self, query, params=None):
+            queries.append(query)
+            return await original(self, query, params)
+
+        monkeypatch.setattr(DAO, "execute_query", recording)
+        operations = await MigrationManager(pre_v2_db).migrate(dry_run=True)
+
+        assert "- Would create FTS5 virtual tables" in operations
+        assert queries and all("schema_" in query for query in queries)
+
     @pytest.mark.asyncio
     async def test_apply_migration(self, pre_v2_db):
         """Test applying migration brings database to latest version."""
@@ -224,6 +242,10 @@ class TestMigrationManager:
         fts_count = conn.execute("SELECT COUNT(*) FROM scripts_fts").fetchone()[0]
         assert fts_count > 0
 
+        # Planner statistics cover the migrated tables
+        analyzed = {row[0] for row in conn.execute("SELECT tbl FROM sqlite_stat1")}
+        assert {"scripts", "workflows"} <= analyzed
+
         conn.close()
 
     @pytest.mark.asyncio
@@ -281,6 +303,162 @@ class TestMigrationManager:
 
         conn.close()
 
+    @pytest.mark.asyncio
+    async def test_data_normalization_is_atomic(self, pre_v2_db, monkeypatch):
+        """A failed write leaves every table as it was."""
+        manager = MigrationManager(pre_v2_db)
+        await manager.migrate(dry_run=False)
+
+        execute_query = DAO.execute_query
+
+        async def failing_execute_query(self, query, params=None):
+            # Scripts are written first, so this fails after they are
+            if "UPDATE workflows" in query:
+                raise sqlite3.OperationalError("disk I/O error")
+            return await execute_query(self, query, params)
+
+        monkeypatch.setattr(DAO, "execute_query", failing_execute_query)
+        with pytest.raises(sqlite3.OperationalError):
+            await manager.normalize_data(dry_run=False)
+
+        conn = sqlite3.connect(pre_v2_db)
+        script_tags = conn.execute("SELECT tags FROM scripts WHERE id = 'script-1'").fetchone()[0]
+        conn.close()
+        assert json.loads(script_tags) == ["Cooling", "cooling", "DEMAND", "demand", "cooling"]
+
+    @pytest.mark.asyncio
+    async def test_tag_normalization_sql_and_python_paths_agree(self, temp_db, monkeypatch):
+        """Rows normalized in SQL and rows left to Python get the same treatment."""
+        import db.migrations as migrations_module
+
+        # Stream the Python-path rows one at a time
+        monkeypatch.setattr(migrations_module, "FETCH_CHUNK_SIZE", 1)
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE scripts (id TEXT PRIMARY KEY, name TEXT, path TEXT, "
+                     "inputs TEXT, outputs TEXT, tags TEXT)")
+        conn.execute("CREATE TABLE workflows (id TEXT PRIMARY KEY, name TEXT, steps TEXT, tags TEXT)")
+        rows = [
+            ("ascii", json.dumps([" Zeta", "alpha ", "ALPHA", "  "])),
+            ("unicode", json.dumps(["ÜBER", "über", "Ärger"])),
+            ("escaped", '["a\\u0062c"]'),
+            ("tabbed", json.dumps(["\tTab", "tab"])),
+            ("clean", '["a", "b"]'),
+            ("empty", "[]"),
+            ("broken", "[not json"),
+        ]
+        conn.executemany("INSERT INTO scripts (id, name, path, tags) VALUES (?, ?, '/x.py', ?)",
+                         [(row_id, row_id, tags) for row_id, tags in rows])
+        conn.commit()
+        conn.close()
+
+        manager = MigrationManager(temp_db)
+        operations = await manager.normalize_data(dry_run=True)
+        changed = {op.rsplit(" ", 1)[1] for op in operations[1:]}
+        assert changed == {"ascii", "unicode", "tabbed"}
+
+        await manager.normalize_data(dry_run=False)
+        conn = sqlite3.connect(temp_db)
+        stored = dict(conn.execute("SELECT id, tags FROM scripts").fetchall())
+        conn.close()
+        assert json.loads(stored["ascii"]) == ["alpha", "zeta"]
+        assert json.loads(stored["unicode"]) == ["ärger", "über"]
+        assert stored["escaped"] == '["a\\u0062c"]'
+        assert json.loads(stored["tabbed"]) == ["tab"]
+        assert stored["clean"] == '["a", "b"]'
+        assert stored["broken"] == "[not json"
+
+    @pytest.mark.asyncio
+    async def test_python_path_scans_overlap(self, temp_db, monkeypatch):
+        """Scripts and workflows left to Python are scanned concurrently."""
+        import db.migrations as migrations_module
+
+        monkeypatch.setattr(migrations_module, "FETCH_CHUNK_SIZE", 1)
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE scripts (id TEXT PRIMARY KEY, name TEXT, path TEXT, "
+                     "inputs TEXT, outputs TEXT, tags TEXT)")
+        conn.execute("CREATE TABLE workflows (id TEXT PRIMARY KEY, name TEXT, steps TEXT, tags TEXT)")
+        conn.executemany("INSERT INTO scripts (id, name, path, tags) VALUES (?, ?, '/x.py', ?)",
+                         [(f"s{i}", f"s{i}", json.dumps([f"Ä{i}"])) for i in range(5)])
+        conn.executemany("INSERT INTO workflows VALUES (?, ?, '[]', ?)",
+                         [(f"w{i}", f"w{i}", json.dumps([f"Ö{i}"])) for i in range(5)])
+        conn.commit()
+        conn.close()
+
+        decoded = []
+        loads = migrations_module.orjson.loads
+        monkeypatch.setattr(migrations_module.orjson, "loads", lambda text: decoded.append(text) or loads(text))
+
+        await MigrationManager(temp_db).normalize_data(dry_run=False)
+        kinds = ["script" if "Ä" in json.loads(text)[0] else "workflow" for text in decoded]
+        assert kinds != sorted(kinds)
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT tags FROM workflows WHERE id = 'w0'").fetchone()[0] == '["ö0"]'
+        conn.close()
+
+    @pytest.mark.asyncio
+    async def test_io_normalization_sql_and_python_paths_agree(self, temp_db):
+        """Item types are normalized the same whether SQL or Python handles the array."""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE scripts (id TEXT PRIMARY KEY, name TEXT, path TEXT, "
+                     "inputs TEXT, outputs TEXT, tags TEXT)")
+        conn.execute("CREATE TABLE workflows (id TEXT PRIMARY KEY, name TEXT, steps TEXT, tags TEXT)")
+        item = {"type": ".EPW", "name": "weather", "required": True, "default": None}
+        rows = [
+            ("scalar", json.dumps([item, {"type": "csv"}])),
+            ("nested", json.dumps([{**item, "default": {"b": 1, "a": 2.5}}])),
+            ("unicode", json.dumps([{"type": ".ÉPW", "name": "weather"}])),
+            ("clean", '[{"type": "csv", "name": "x"}]'),
+            ("broken", "[not json"),
+        ]
+        conn.executemany("INSERT INTO scripts (id, name, path, inputs) VALUES (?, ?, '/x.py', ?)",
+                         [(row_id, row_id, inputs) for row_id, inputs in rows])
+        conn.commit()
+        conn.close()
+
+        manager = MigrationManager(temp_db)
+        operations = await manager.normalize_data(dry_run=True)
+        assert {op.rsplit(" ", 1)[1] for op in operations[1:]} == {"scalar", "nested", "unicode"}
+
+        await manager.normalize_data(dry_run=False)
+        conn = sqlite3.connect(temp_db)
+        stored = dict(conn.execute("SELECT id, inputs FROM scripts").fetchall())
+        conn.close()
+        assert stored["scalar"] == (
+            '[{"default":null,"name":"weather","required":true,"type":"epw"},{"type":"csv"}]'
+        )
+        assert stored["nested"] == (
+            '[{"default":{"a":2.5,"b":1},"name":"weather","required":true,"type":"epw"}]'
+        )
+        assert json.loads(stored["unicode"]) == [{"name": "weather", "type": "épw"}]
+        assert stored["clean"] == '[{"type": "csv", "name": "x"}]'
+        assert stored["broken"] == "[not json"
+
+    @pytest.mark.asyncio
+    async def test_normalization_skips_python_for_sql_handled_rows(self, temp_db, monkeypatch):
+        """Rows with only ASCII tags and no inputs/outputs never reach the Python loop."""
+        import db.migrations as migrations_module
+
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE scripts (id TEXT PRIMARY KEY, name TEXT, path TEXT, "
+                     "inputs TEXT, outputs TEXT, tags TEXT)")
+        conn.execute("CREATE TABLE workflows (id TEXT PRIMARY KEY, name TEXT, steps TEXT, tags TEXT)")
+        conn.executemany(
+            "INSERT INTO scripts (id, name, path, inputs, outputs, tags) VALUES (?, ?, '/x.py', ?, '[]', ?)",
+            [(f"s{i}", f"s{i}", None if i % 2 else "[]", json.dumps(["B", "a"])) for i in range(20)],
+        )
+        conn.execute("INSERT INTO workflows VALUES ('w', 'w', '[]', '[\"X\"]')")
+        conn.commit()
+        conn.close()
+
+        decoded = []
+        loads = migrations_module.orjson.loads
+        monkeypatch.setattr(migrations_module.orjson, "loads", lambda text: decoded.append(text) or loads(text))
+
+        operations = await MigrationManager(temp_db).normalize_data(dry_run=True)
+        assert len(operations) == 22
+        assert decoded == []
+
     @pytest.mark.asyncio
     async def test_integrity_checks(self, pre_v2_db):
         """Test integrity checking after migration."""
@@ -299,6 +477,29 @@ class TestMigrationManager:
         # Should detect invalid JSON
         assert any("invalid JSON" in issue.lower() for issue in error_issues)
 
+    @pytest.mark.asyncio
+    async def test_integrity_check_counts(self, temp_db):
+        """Invalid JSON and duplicate names are counted per column and table."""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE scripts (id TEXT PRIMARY KEY, name TEXT, inputs TEXT, outputs TEXT)")
+        conn.execute("CREATE TABLE workflows (id TEXT PRIMARY KEY, name TEXT, steps TEXT)")
+        conn.executemany("INSERT INTO scripts VALUES (?, ?, ?, ?)", [
+            ("a", "dup", "{bad", "[]"),
+            ("b", "dup", "{bad", "{bad"),
+            ("c", "ok", None, ""),
+        ])
+        conn.execute("INSERT INTO workflows VALUES ('w', 'flow', '[1]')")
+        conn.commit()
+        conn.close()
+
+        issues = await MigrationManager(temp_db).check_integrity()
+        assert issues == [
+            "Database integrity issues found:",
+            "- Found 2 scripts with invalid JSON inputs",
+            "- Found 1 scripts with invalid JSON outputs",
+            "- Found 1 duplicate script names",
+        ]
+
     @pytest.mark.asyncio
     async def test_idempotent_migrations(self, pre_v2_db):
         """Test that migrations are idempotent."""
@@ -330,6 +531,140 @@ class TestMigrationManager:
         with pytest.raises(Exception):
             await manager.migrate(dry_run=False)
 
+    @pytest.mark.asyncio
+    async def test_migrate_uses_one_connection(self, pre_v2_db, monkeypatch):
+        """All migration steps share a single connection."""
+        import db.dao as dao_module
+
+        opened = []
+        connect = dao_module.aiosqlite.connect
+
+        def counting_connect(*args, **kwargs):
+            opened.append(args)
+            return connect(*args, **kwargs)
+
+        monkeypatch.setattr(dao_module.aiosqlite, "connect", counting_connect)
+        manager = MigrationManager(pre_v2_db)
+        await manager.migrate(dry_run=False)
+
+        assert len(opened) == 1
+        assert manager._dao._connection is None
+
+    @pytest.mark.asyncio
+    async def test_schema_state_tracks_current_version(self, temp_db):
+        """The current version is a single row; older databases fall back to the log."""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE schema_version (version INTEGER NOT NULL, migration_name TEXT NOT NULL, "
+                     "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO schema_version (version, migration_name) VALUES (1, 'initial_versioning')")
+        conn.commit()
+        conn.close()
+
+        assert await MigrationManager(temp_db).get_schema_version() == 1
+
+        await MigrationManager(temp_db).set_schema_version(2, "fts5_and_performance")
+        await MigrationManager(temp_db).set_schema_version(1, "replayed")
+        assert await MigrationManager(temp_db).get_schema_version() == 2
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT id, version FROM schema_state").fetchall() == [(1, 2)]
+        assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == 3
+        conn.close()
+
+    @pytest.mark.asyncio
+    async def test_schema_version_is_read_once(self, pre_v2_db, monkeypatch):
+        """The version is queried once and then tracked through the migration."""
+        queries = []
+        execute_query = DAO.execute_query
+
+        async def counting_execute_query(self, query, params=None):
+            queries.append(query)
+            return await execute_query(self, query, params)
+
+        monkeypatch.setattr(DAO, "execute_query", counting_execute_query)
+        manager = MigrationManager(pre_v2_db)
+        assert await manager.needs_migration()
+        await manager.migrate(dry_run=False)
+        assert await manager.get_schema_version() == 2
+        assert not await manager.needs_migration()
+
+        assert sum("MAX(version)" in query for query in queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_write_paths_are_serialized(self, pre_v2_db):
+        """migrate and normalize_data started together do not interleave transactions."""
+        manager = MigrationManager(pre_v2_db)
+        await asyncio.gather(
+            manager.migrate(dry_run=False),
+            manager.normalize_data(dry_run=False),
+            manager.check_integrity(),
+        )
+        assert await manager.get_schema_version() == 2
+
+        conn = sqlite3.connect(pre_v2_db)
+        tags = conn.execute("SELECT tags FROM scripts WHERE id = 'script-1'").fetchone()[0]
+        conn.close()
+        assert json.loads(tags) == ["cooling", "demand"]
+
+    @pytest.mark.asyncio
+    async def test_read_only_dao_cannot_write(self, pre_v2_db):
+        """A read-only DAO reads the database but any write fails."""
+        async with DAO(pre_v2_db, read_only=True) as dao:
+            cursor = await dao.execute_query("SELECT COUNT(*) FROM scripts")
+            assert (await cursor.fetchone())[0] == 2
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                await dao.execute_query("DELETE FROM scripts")
+
+    @pytest.mark.asyncio
+    async def test_failed_v2_migration_rolls_back(self, pre_v2_db, monkeypatch):
+        """A failure partway through v2 leaves neither FTS tables nor a v2 version row."""
+        manager = MigrationManager(pre_v2_db)
+        execute_query = DAO.execute_query
+
+        async def failing_execute_query(self, query, params=None):
+            if "CREATE TRIGGER IF NOT EXISTS workflows_au" in query:
+                raise sqlite3.OperationalError("disk I/O error")
+            return await execute_query(self, query, params)
+
+        monkeypatch.setattr(DAO, "execute_query", failing_execute_query)
+        with pytest.raises(sqlite3.OperationalError):
+            await manager.migrate(dry_run=False)
+        monkeypatch.undo()
+
+        assert await manager.get_schema_version() == 1
+        conn = sqlite3.connect(pre_v2_db)
+        leftovers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE '%_fts' OR type = 'trigger'"
+        ).fetchall()
+        conn.close()
+        assert leftovers == []
+
+        await manager.migrate(dry_run=False)
+        assert await manager.get_schema_version() == 2
+
+    @pytest.mark.asyncio
+    async def test_migration_handles_minimal_schema(self, temp_db):
+        """Columns an older schema lacks are indexed as empty and skipped for indexes."""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("CREATE TABLE scripts (id TEXT PRIMARY KEY, name TEXT, tags TEXT)")
+        conn.execute("CREATE TABLE workflows (id TEXT PRIMARY KEY, name TEXT, created_at TIMESTAMP)")
+        conn.execute("INSERT INTO scripts VALUES ('s', 'solar', '[\"pv\"]')")
+        conn.execute("INSERT INTO workflows VALUES ('w', 'flow', NULL)")
+        conn.commit()
+        conn.close()
+
+        manager = MigrationManager(temp_db)
+        await manager.migrate(dry_run=False)
+        assert await manager.get_schema_version() == 2
+
+        conn = sqlite3.connect(temp_db)
+        assert conn.execute("SELECT rowid FROM scripts_fts WHERE scripts_fts MATCH 'pv'").fetchall() == [(1,)]
+        assert conn.execute("SELECT rowid FROM workflows_fts WHERE workflows_fts MATCH 'flow'").fetchall() == [(1,)]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert "idx_workflows_created_at" in indexes
+        assert "idx_scripts_created_at" not in indexes
+
     @pytest.mark.asyncio
     async def test_schema_version_tracking(self, temp_db):
         """Test that schema versions are tracked correctly."""